@@ -1,12 +1,70 @@
+import logging
+
 # Import the MongoClient class from pymongo to interact with MongoDB
-from pymongo import MongoClient
+import pymongo
+from pymongo import MongoClient, ASCENDING, DESCENDING
 # Import the centralized configuration
 from app.config.settings import settings
 
 # Create a MongoDB client instance using the centralized configuration
-# This establishes a connection to the MongoDB server
-client = MongoClient(settings.get_database_url())
+# This single client (and its connection pool) is shared by every repository
+client = MongoClient(
+    settings.get_database_url(),
+    maxPoolSize=settings.mongo_max_pool_size,
+    minPoolSize=settings.mongo_min_pool_size,
+    waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms
+)
 
 # Access the specific database using the configuration
 # 'db' will be the object we use to perform operations (e.g., insert, find) on this database
-db = client[settings.database_name]
\ No newline at end of file
+db = client[settings.database_name]
+
+logger = logging.getLogger(__name__)
+
+# Seconds the startup ping waits for a server before giving up. The client's
+# default server selection timeout is 30s, which would hold up startup
+MONGO_PING_TIMEOUT_SECONDS = 2
+
+
+def ping_database() -> bool:
+    """
+    Ping MongoDB so the connection pool is established before the first request.
+    
+    The ping gives up after MONGO_PING_TIMEOUT_SECONDS. Failures are logged
+    rather than raised; the client keeps retrying on use.
+    
+    Returns:
+        True if the server answered
+    """
+    try:
+        with pymongo.timeout(MONGO_PING_TIMEOUT_SECONDS):
+            client.admin.command("ping")
+        logger.info("MongoDB connection established")
+        return True
+    except Exception as e:
+        logger.error(f"MongoDB ping failed: {str(e)}")
+        return False
+
+
+def ensure_indexes() -> None:
+    """
+    Create the compound indexes used by the hot query paths.
+    
+    create_index is a no-op when the index already exists, so this is safe to
+    run on every startup. Failures are logged rather than raised so the API can
+    still start against a read-only or restricted database user.
+    """
+    indexes = [
+        # Messages of a conversation in chronological order (context lookup, message lists)
+        (db.messages, [("conversation_id", ASCENDING), ("timestamp", ASCENDING)]),
+        # A user's conversations, newest first, paginated by _id
+        (db.conversations, [("user_id", ASCENDING), ("_id", DESCENDING)]),
+        # Practice images looked up by name ($in over the files on disk)
+        (db.image_descriptions, [("name", ASCENDING)]),
+    ]
+    for collection, keys in indexes:
+        try:
+            name = collection.create_index(keys)
+            logger.info(f"Ensured index {name} on {collection.name}")
+        except Exception as e:
+            logger.error(f"Failed to create index {keys} on {collection.name}: {str(e)}")
@@ -23,6 +23,9 @@ class ApplicationConfig(BaseSettings):
     # Database Configuration
     mongodb_url: str = Field(description="MongoDB connection string")
     database_name: str = Field(description="MongoDB database name")
+    mongo_max_pool_size: int = Field(default=50, description="Maximum MongoDB connections per worker", alias="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=5, description="MongoDB connections kept open per worker", alias="MONGO_MIN_POOL_SIZE")
+    mongo_wait_queue_timeout_ms: int = Field(default=2000, description="How long a request waits for a free MongoDB connection", alias="MONGO_WAIT_QUEUE_TIMEOUT_MS")
     
     # Security Configuration
     jwt_secret_key: SecretStr = Field(description="JWT secret key (minimum 32 characters)", alias="JWT_SECRET_KEY")
@@ -66,6 +69,10 @@ class ApplicationConfig(BaseSettings):
     
     # Performance Configuration
     worker_count: int = Field(default=1, description="Number of worker processes", alias="WORKER_COUNT")
+    whisper_cpu_int8: bool = Field(default=False, description="Quantize Whisper linear layers to int8 when running on CPU (faster, slightly less accurate)", alias="WHISPER_CPU_INT8")
+    conversation_cache_ttl: int = Field(default=5, description="Seconds a conversation read by ID is served from this worker's memory", alias="CONVERSATION_CACHE_TTL")
+    conversation_context_cache_enabled: bool = Field(default=False, description="Cache conversation contexts between message turns", alias="CONVERSATION_CONTEXT_CACHE_ENABLED")
+    conversation_context_cache_ttl: int = Field(default=30, description="Seconds a cached conversation context stays valid", alias="CONVERSATION_CONTEXT_CACHE_TTL")
     
     class Config:
         env_file = ".env"
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.routes import (
     user_controller,
@@ -13,7 +14,10 @@ from fastapi.openapi.models import SecurityScheme
 from fastapi.security import OAuth2PasswordBearer
 from typing import Dict
 from app.utils.event_handler import event_handler
+from app.utils.async_utils import run_in_thread
+from app.config.database import ensure_indexes, ping_database
 from app.config.settings import settings
+from app.utils.file_utils import MAX_FILE_SIZE, exceeds_upload_limit
 # Audio processing now handled by AudioService
 import logging
 from pathlib import Path
@@ -37,6 +41,8 @@ app = FastAPI(
     """,
     version=settings.app_version,
     debug=settings.debug_mode,
+    # orjson serializes responses (including datetimes) much faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {
             "name": "users",
@@ -92,6 +98,24 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Upload endpoints whose request size is checked before the body is parsed
+UPLOAD_PATHS = frozenset({"/api/audio/transcribe"})
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Reject uploads whose declared Content-Length exceeds the size limit.
+    
+    FastAPI parses multipart bodies (spooling them to disk) before the
+    endpoint runs, so this check has to happen before routing.
+    """
+    if request.url.path in UPLOAD_PATHS and exceeds_upload_limit(request.headers.get("content-length")):
+        return ORJSONResponse(
+            status_code=413,
+            content={"detail": f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"}
+        )
+    return await call_next(request)
+
 # Include routers
 app.include_router(
     user_controller,
@@ -157,8 +181,17 @@ async def root():
 async def startup_event():
     """
     Function that runs on application startup.
-    Starts the background task processor.
+    Warms up the database connection, ensures indexes and starts the
+    background task processor.
+    
+    When MongoDB is unreachable the index check is skipped, so the API (and
+    /docs) still come up without waiting on server selection timeouts.
     """
+    if await run_in_thread(ping_database):
+        await run_in_thread(ensure_indexes)
+    else:
+        logging.getLogger(__name__).warning("Skipping index creation: MongoDB is unreachable")
+    
     # Start the event handler
     event_handler.start()
 
@@ -6,7 +6,9 @@ that can be inherited by specific repository classes.
 """
 
 import logging
-from typing import Dict, Any, Optional, List, TypeVar, Generic, Type
+from typing import Dict, Any, Optional, List, TypeVar, Generic, Type, Iterator
+from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 from fastapi import HTTPException
 
@@ -22,6 +24,9 @@ logger = logging.getLogger(__name__)
 # Generic type for model classes
 T = TypeVar('T')
 
+# Maximum number of IDs sent in a single $in query
+IN_QUERY_BATCH_SIZE = 100
+
 
 class BaseRepository(Generic[T]):
     """
@@ -60,17 +65,16 @@ class BaseRepository(Generic[T]):
         try:
             self.logger.info(f"Creating new {self.collection_name} document")
             
-            # Add timestamps if not present
-            if "created_at" not in data:
-                data["created_at"] = datetime.utcnow()
-            if "updated_at" not in data:
-                data["updated_at"] = datetime.utcnow()
+            # Add timestamps if not present, read from the clock once so they match
+            now = datetime.utcnow()
+            data.setdefault("created_at", now)
+            data.setdefault("updated_at", now)
             
             # Insert document
             result = self.collection.insert_one(data)
             
-            # Fetch and return the created document
-            created_doc = self.collection.find_one({"_id": result.inserted_id})
+            # The inserted data is the stored document; no need to read it back
+            created_doc = {**data, "_id": result.inserted_id}
             
             self.logger.info(f"Successfully created {self.collection_name} with ID: {result.inserted_id}")
             return mongo_doc_to_dict(created_doc)
@@ -147,7 +151,8 @@ class BaseRepository(Generic[T]):
     
     def find_all(self, filter_dict: Optional[Dict[str, Any]] = None, 
                  skip: int = 0, limit: Optional[int] = None,
-                 sort: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+                 sort: Optional[List[tuple]] = None,
+                 projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Find all documents matching the filter criteria.
         
@@ -156,6 +161,7 @@ class BaseRepository(Generic[T]):
             skip: Number of documents to skip
             limit: Maximum number of documents to return
             sort: List of sort criteria tuples (field, direction)
+            projection: Optional MongoDB projection limiting the returned fields
             
         Returns:
             List of matching documents (with string 'id's)
@@ -170,7 +176,7 @@ class BaseRepository(Generic[T]):
             self.logger.debug(f"Finding {self.collection_name} documents with filter: {filter_dict}")
             
             # Build query
-            cursor = self.collection.find(filter_dict)
+            cursor = self.collection.find(filter_dict, projection)
             
             # Apply sorting if provided
             if sort:
@@ -217,19 +223,17 @@ class BaseRepository(Generic[T]):
             
             self.logger.info(f"Updating {self.collection_name} with ID: {document_id}")
             
-            # Update document
-            result = self.collection.update_one(
+            # Update and return the updated document in a single round-trip
+            updated_doc = self.collection.find_one_and_update(
                 {"_id": obj_id},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.matched_count == 0:
+            if updated_doc is None:
                 self.logger.warning(f"No {self.collection_name} found with ID: {document_id}")
                 return None
             
-            # Fetch and return updated document
-            updated_doc = self.collection.find_one({"_id": obj_id})
-            
             self.logger.info(f"Successfully updated {self.collection_name} with ID: {document_id}")
             return mongo_doc_to_dict(updated_doc)
             
@@ -280,6 +284,68 @@ class BaseRepository(Generic[T]):
                 detail=f"Failed to delete {self.collection_name}: {str(e)}"
             )
     
+    @staticmethod
+    def _id_batches(ids: List[ObjectId]) -> Iterator[List[ObjectId]]:
+        """Split IDs into chunks small enough for a single $in query."""
+        for start in range(0, len(ids), IN_QUERY_BATCH_SIZE):
+            yield ids[start:start + IN_QUERY_BATCH_SIZE]
+    
+    def find_by_ids(self, ids: List[ObjectId],
+                    projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Find documents by ID, batching the $in queries.
+        
+        Args:
+            ids: ObjectIds of the documents to find
+            projection: Optional MongoDB projection limiting the returned fields
+            
+        Returns:
+            List of matching documents (with string 'id's)
+            
+        Raises:
+            HTTPException: If query fails
+        """
+        try:
+            documents = []
+            for batch in self._id_batches(ids):
+                documents.extend(self.collection.find({"_id": {"$in": batch}}, projection))
+            return mongo_docs_to_dicts(documents)
+            
+        except Exception as e:
+            self.logger.error(f"Error finding {self.collection_name} documents by IDs: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to find {self.collection_name} documents: {str(e)}"
+            )
+    
+    def delete_by_ids(self, ids: List[ObjectId]) -> int:
+        """
+        Delete documents by ID, batching the $in queries.
+        
+        Args:
+            ids: ObjectIds of the documents to delete
+            
+        Returns:
+            Number of deleted documents
+            
+        Raises:
+            HTTPException: If deletion fails
+        """
+        try:
+            deleted_count = 0
+            for batch in self._id_batches(ids):
+                deleted_count += self.collection.delete_many({"_id": {"$in": batch}}).deleted_count
+            
+            self.logger.info(f"Deleted {deleted_count} {self.collection_name} documents")
+            return deleted_count
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting {self.collection_name} documents by IDs: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to delete {self.collection_name} documents: {str(e)}"
+            )
+    
     def count(self, filter_dict: Optional[Dict[str, Any]] = None) -> int:
         """
         Count documents matching the filter criteria.
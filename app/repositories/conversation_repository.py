@@ -13,6 +13,7 @@ from fastapi import HTTPException
 
 from app.repositories.base_repository import BaseRepository
 from app.models.conversation import Conversation
+from app.utils.object_id import mongo_doc_to_dict
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,8 @@ class ConversationRepository(BaseRepository[Conversation]):
         super().__init__("conversations", Conversation)
     
     def create_conversation(self, user_id: str, user_role: str, ai_role: str, 
-                          situation: str, voice_type: Optional[str] = None) -> Dict[str, Any]:
+                          situation: str, voice_type: Optional[str] = None,
+                          conversation_id: Optional[ObjectId] = None) -> Dict[str, Any]:
         """
         Create a new conversation.
         
@@ -40,6 +42,7 @@ class ConversationRepository(BaseRepository[Conversation]):
             ai_role: Role of the AI in the conversation
             situation: Description of the conversation situation
             voice_type: Optional voice type preference
+            conversation_id: Optional pre-generated ID for the conversation
             
         Returns:
             Created conversation document
@@ -59,6 +62,8 @@ class ConversationRepository(BaseRepository[Conversation]):
                 situation=situation,
                 voice_type=voice_type
             )
+            if conversation_id is not None:
+                conversation._id = conversation_id
             
             # Use base repository create method
             return self.create(conversation.to_dict())
@@ -82,15 +87,70 @@ class ConversationRepository(BaseRepository[Conversation]):
         """
         return self.find_by_id(conversation_id)
     
+    def get_with_messages(self, conversation_id: str, msg_limit: Optional[int] = None,
+                          msg_projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a conversation and its messages in a single aggregation.
+        
+        Messages are joined server-side with $lookup and returned oldest first
+        under the "messages" key.
+        
+        Args:
+            conversation_id: String representation of the conversation ID
+            msg_limit: Maximum number of messages to return
+            msg_projection: Optional projection applied to the joined messages
+            
+        Returns:
+            Conversation document with its messages if found, None otherwise
+            
+        Raises:
+            HTTPException: If conversation_id is invalid or the query fails
+        """
+        try:
+            conversation_object_id = ObjectId(conversation_id)
+            
+            message_pipeline: List[Dict[str, Any]] = [{"$sort": {"timestamp": 1}}]
+            if msg_limit:
+                message_pipeline.append({"$limit": msg_limit})
+            if msg_projection:
+                message_pipeline.append({"$project": msg_projection})
+            
+            pipeline = [
+                {"$match": {"_id": conversation_object_id}},
+                {"$lookup": {
+                    "from": "messages",
+                    "localField": "_id",
+                    "foreignField": "conversation_id",
+                    "pipeline": message_pipeline,
+                    "as": "messages"
+                }}
+            ]
+            
+            documents = list(self.collection.aggregate(pipeline))
+            if not documents:
+                return None
+            return mongo_doc_to_dict(documents[0])
+            
+        except Exception as e:
+            self.logger.error(f"Error getting conversation with messages: {str(e)}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid conversation ID or query failed: {str(e)}"
+            )
+    
     def get_user_conversations(self, user_id: str, skip: int = 0, 
-                             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                             limit: Optional[int] = None,
+                             projection: Optional[Dict[str, Any]] = None,
+                             after: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Get all conversations for a specific user.
+        Get all conversations for a specific user, newest first.
         
         Args:
             user_id: String representation of the user ID
             skip: Number of conversations to skip for pagination
             limit: Maximum number of conversations to return
+            projection: Optional MongoDB projection limiting the returned fields
+            after: Optional conversation ID cursor; only older conversations are returned
             
         Returns:
             List of user's conversations
@@ -104,15 +164,19 @@ class ConversationRepository(BaseRepository[Conversation]):
             
             # Build filter for user's conversations
             filter_dict = {"user_id": user_object_id}
+            if after:
+                filter_dict["_id"] = {"$lt": ObjectId(after)}
             
-            # Sort by most recent first
-            sort = [("started_at", -1)]
+            # Sort by most recent first; ObjectIds are created with the conversation,
+            # so _id order matches started_at and doubles as the pagination cursor
+            sort = [("_id", -1)]
             
             return self.find_all(
                 filter_dict=filter_dict,
                 skip=skip,
                 limit=limit,
-                sort=sort
+                sort=sort,
+                projection=projection
             )
             
         except Exception as e:
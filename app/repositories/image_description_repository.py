@@ -1,4 +1,10 @@
+from datetime import datetime
+from typing import Any, Dict, List, Set
+
+from fastapi import HTTPException
+
 from app.repositories.base_repository import BaseRepository
+from app.utils.object_id import mongo_docs_to_dicts
 from app.models.image_description import ImageDescription
 
 class ImageDescriptionRepository(BaseRepository[ImageDescription]):
@@ -9,4 +15,88 @@ class ImageDescriptionRepository(BaseRepository[ImageDescription]):
         super().__init__("image_descriptions", ImageDescription)
 
     def find_by_name(self, name: str):
-        return self.find_one({"name": name}) 
\ No newline at end of file
+        return self.find_one({"name": name})
+
+    def find_existing_names(self, names: List[str]) -> Set[str]:
+        """
+        Return which of the given image names already have a stored description.
+        
+        Args:
+            names: Image names (URLs) to look up
+            
+        Returns:
+            The subset of names that exist in the collection
+            
+        Raises:
+            HTTPException: If the query fails
+        """
+        try:
+            existing = set()
+            for batch in self._id_batches(names):
+                existing.update(
+                    doc["name"] for doc in self.collection.find({"name": {"$in": batch}}, {"name": 1, "_id": 0})
+                )
+            return existing
+        except Exception as e:
+            self.logger.error(f"Error looking up image names: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to look up images: {str(e)}"
+            )
+
+    def find_by_names(self, names: List[str]) -> List[Dict[str, Any]]:
+        """
+        Find the image descriptions with the given names.
+        
+        Args:
+            names: Image names (URLs) to fetch
+            
+        Returns:
+            List of matching documents (with string 'id's)
+            
+        Raises:
+            HTTPException: If the query fails
+        """
+        try:
+            documents = []
+            for batch in self._id_batches(names):
+                documents.extend(self.collection.find({"name": {"$in": batch}}))
+            return mongo_docs_to_dicts(documents)
+        except Exception as e:
+            self.logger.error(f"Error finding images by name: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to retrieve images: {str(e)}"
+            )
+
+    def bulk_create(self, docs: List[Dict[str, Any]]) -> int:
+        """
+        Insert several image descriptions in a single round trip.
+        
+        The insert is unordered, so one bad document doesn't stop the rest.
+        
+        Args:
+            docs: Image description documents to insert
+            
+        Returns:
+            Number of documents inserted
+            
+        Raises:
+            HTTPException: If the insert fails
+        """
+        if not docs:
+            return 0
+        try:
+            now = datetime.utcnow()
+            for doc in docs:
+                doc.setdefault("created_at", now)
+                doc.setdefault("updated_at", now)
+            result = self.collection.insert_many(docs, ordered=False)
+            self.logger.info(f"Inserted {len(result.inserted_ids)} image descriptions")
+            return len(result.inserted_ids)
+        except Exception as e:
+            self.logger.error(f"Error bulk inserting image descriptions: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to save images: {str(e)}"
+            )
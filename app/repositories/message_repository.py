@@ -6,16 +6,36 @@ extending the base repository with message-specific methods.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from bson import ObjectId
 from fastapi import HTTPException
 
 from app.repositories.base_repository import BaseRepository
 from app.models.message import Message
+from app.utils.cache import TTLCache
+from app.utils.object_id import ensure_object_id, mongo_doc_to_dict, str_to_object_id
 
 logger = logging.getLogger(__name__)
 
+# Seconds a message fetched by ID is served from memory. The message and
+# feedback endpoints are usually called back to back for the same message
+MESSAGE_CACHE_TTL = 5
+
+_message_cache = TTLCache(maxsize=1024, ttl=MESSAGE_CACHE_TTL)
+
+# Seconds a "feedback not ready yet" result is remembered. Clients poll for
+# feedback while it is being generated, so repeated polls are answered locally
+PENDING_FEEDBACK_TTL = 1.5
+
+_pending_feedback = TTLCache(maxsize=4096, ttl=PENDING_FEEDBACK_TTL)
+
+
+def _forget_message(message_id: str) -> None:
+    """Drop every cached entry for a message after it changes."""
+    _message_cache.pop(message_id)
+    _pending_feedback.pop(message_id)
+
 
 class MessageRepository(BaseRepository[Message]):
     """
@@ -29,14 +49,44 @@ class MessageRepository(BaseRepository[Message]):
         """Initialize the message repository."""
         super().__init__("messages", Message)
     
-    def create_message(self, conversation_id: str, sender: str, content: str,
+    def build_message_document(self, conversation_id: Union[str, ObjectId], sender: str, content: str,
+                               audio_path: Optional[str] = None, transcription: Optional[str] = None,
+                               feedback_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a message document, including its _id and timestamp, without inserting it.
+        
+        Args:
+            conversation_id: Conversation ID, as an ObjectId or its string form
+            sender: Message sender ("user" or "ai")
+            content: Message content
+            audio_path: Optional path to audio file
+            transcription: Optional transcription of audio
+            feedback_id: Optional feedback ID
+            
+        Returns:
+            Message document ready to be passed to create()
+        """
+        # Convert conversation_id to ObjectId, reusing it if already parsed
+        conversation_object_id = ensure_object_id(conversation_id)
+        
+        message = Message(
+            conversation_id=conversation_object_id,
+            sender=sender,
+            content=content,
+            audio_path=audio_path,
+            transcription=transcription,
+            feedback_id=feedback_id
+        )
+        return message.to_dict()
+    
+    def create_message(self, conversation_id: Union[str, ObjectId], sender: str, content: str,
                       audio_path: Optional[str] = None, transcription: Optional[str] = None,
                       feedback_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new message.
         
         Args:
-            conversation_id: String representation of the conversation ID
+            conversation_id: Conversation ID, as an ObjectId or its string form
             sender: Message sender ("user" or "ai")
             content: Message content
             audio_path: Optional path to audio file
@@ -50,22 +100,16 @@ class MessageRepository(BaseRepository[Message]):
             HTTPException: If creation fails
         """
         try:
-            # Convert conversation_id to ObjectId
-            conversation_object_id = ObjectId(conversation_id)
-            
-            # Create message model instance
-            message = Message(
-                conversation_id=conversation_object_id,
-                sender=sender,
-                content=content,
-                audio_path=audio_path,
-                transcription=transcription,
-                feedback_id=feedback_id
+            message_doc = self.build_message_document(
+                conversation_id, sender, content,
+                audio_path=audio_path, transcription=transcription, feedback_id=feedback_id
             )
             
             # Use base repository create method
-            return self.create(message.to_dict())
+            return self.create(message_doc)
             
+        except HTTPException:
+            raise
         except Exception as e:
             self.logger.error(f"Error creating message: {str(e)}")
             raise HTTPException(
@@ -83,10 +127,104 @@ class MessageRepository(BaseRepository[Message]):
         Returns:
             Message document if found, None otherwise
         """
-        return self.find_by_id(message_id)
+        cached = _message_cache.get(message_id)
+        if cached is not None:
+            return dict(cached)
+        
+        message = self.find_by_id(message_id)
+        if message is not None:
+            _message_cache.set(message_id, message)
+            return dict(message)
+        return None
+    
+    def get_message_with_feedback(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a message and its feedback in a single aggregation.
+        
+        The feedback document is joined server-side with $lookup and returned
+        under the "feedback" key, or None when the message has no feedback yet.
+        A "no feedback yet" result is remembered for PENDING_FEEDBACK_TTL seconds,
+        or until the message is updated, so polling clients don't query each time.
+        
+        Args:
+            message_id: String representation of the message ID
+            
+        Returns:
+            Message document with its feedback if found, None otherwise
+            
+        Raises:
+            HTTPException: If message_id is invalid or the query fails
+        """
+        pending = _pending_feedback.get(message_id)
+        if pending is not None:
+            return {**pending, "feedback": None}
+        
+        message_object_id = str_to_object_id(message_id, "message ID")
+        try:
+            pipeline = [
+                {"$match": {"_id": message_object_id}},
+                {"$limit": 1},
+                # feedback_id is stored as a string, so convert it before matching _id
+                {"$lookup": {
+                    "from": "feedback",
+                    "let": {"feedback_id": "$feedback_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": [
+                            "$_id",
+                            {"$convert": {"input": "$$feedback_id", "to": "objectId", "onError": None, "onNull": None}}
+                        ]}}},
+                        {"$limit": 1}
+                    ],
+                    "as": "feedback"
+                }}
+            ]
+            
+            documents = list(self.collection.aggregate(pipeline))
+            if not documents:
+                return None
+            
+            message = mongo_doc_to_dict(documents[0])
+            joined = message.pop("feedback")
+            # The message itself is cached like get_message_by_id, for the sibling message endpoints
+            _message_cache.set(message_id, dict(message))
+            if not joined:
+                _pending_feedback.set(message_id, dict(message))
+            message["feedback"] = mongo_doc_to_dict(joined[0]) if joined else None
+            return message
+            
+        except Exception as e:
+            self.logger.error(f"Error getting message with feedback: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to get message feedback: {str(e)}"
+            )
+    
+    def update(self, document_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a message, dropping any cached copy of it."""
+        _forget_message(str(document_id))
+        try:
+            return super().update(document_id, update_data)
+        finally:
+            _forget_message(str(document_id))
+    
+    def delete(self, document_id: str) -> bool:
+        """Delete a message, dropping any cached copy of it."""
+        try:
+            return super().delete(document_id)
+        finally:
+            _forget_message(str(document_id))
+    
+    def delete_by_ids(self, ids: List[ObjectId]) -> int:
+        """Delete messages by ID, dropping any cached copies of them."""
+        try:
+            return super().delete_by_ids(ids)
+        finally:
+            for message_id in ids:
+                _forget_message(str(message_id))
     
     def get_messages_by_conversation(self, conversation_id: str, skip: int = 0,
-                                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                                   limit: Optional[int] = None,
+                                   projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Get all messages for a specific conversation.
         
@@ -94,6 +232,7 @@ class MessageRepository(BaseRepository[Message]):
             conversation_id: String representation of the conversation ID
             skip: Number of messages to skip for pagination
             limit: Maximum number of messages to return
+            projection: Optional MongoDB projection limiting the returned fields
             
         Returns:
             List of messages in the conversation
@@ -115,7 +254,8 @@ class MessageRepository(BaseRepository[Message]):
                 filter_dict=filter_dict,
                 skip=skip,
                 limit=limit,
-                sort=sort
+                sort=sort,
+                projection=projection
             )
             
         except Exception as e:
@@ -125,6 +265,33 @@ class MessageRepository(BaseRepository[Message]):
                 detail=f"Invalid conversation ID or query failed: {str(e)}"
             )
     
+    def delete_messages_by_conversation(self, conversation_id: str) -> int:
+        """
+        Delete all messages belonging to a conversation.
+        
+        Args:
+            conversation_id: String representation of the conversation ID
+            
+        Returns:
+            Number of deleted messages
+            
+        Raises:
+            HTTPException: If conversation_id is invalid or deletion fails
+        """
+        try:
+            conversation_object_id = ObjectId(conversation_id)
+            message_ids = [
+                doc["_id"] for doc in self.collection.find({"conversation_id": conversation_object_id}, {"_id": 1})
+            ]
+        except Exception as e:
+            self.logger.error(f"Error listing conversation messages for deletion: {str(e)}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid conversation ID or query failed: {str(e)}"
+            )
+        
+        return self.delete_by_ids(message_ids)
+    
     def get_user_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
         """
         Get all user messages from a conversation.
@@ -303,12 +470,14 @@ class MessageRepository(BaseRepository[Message]):
                 detail=f"Invalid conversation ID or query failed: {str(e)}"
             )
     
-    def get_latest_message(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+    def get_latest_message(self, conversation_id: str,
+                           projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Get the latest message from a conversation.
         
         Args:
             conversation_id: String representation of the conversation ID
+            projection: Optional MongoDB projection limiting the returned fields
             
         Returns:
             Latest message document if found, None otherwise
@@ -326,7 +495,8 @@ class MessageRepository(BaseRepository[Message]):
             messages = self.find_all(
                 filter_dict=filter_dict,
                 limit=1,
-                sort=sort
+                sort=sort,
+                projection=projection
             )
             
             return messages[0] if messages else None
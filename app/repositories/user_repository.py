@@ -113,10 +113,10 @@ class UserRepository(BaseRepository[User]):
             The updated user document if found, None otherwise
         """
         try:
+            # update() stamps updated_at itself
             delete_data = {
                 "is_deleted": True,
-                "deleted_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "deleted_at": datetime.utcnow()
             }
             return self.update(user_id, delete_data)
         except Exception as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, Security, Query
+from fastapi import APIRouter, Depends, status, UploadFile, File, Security, Query, BackgroundTasks
 from typing import List
 
 from app.schemas.audio import AudioResponse
@@ -14,6 +14,7 @@ router = APIRouter(
 
 @router.post("/transcribe", response_model=dict)
 def transcribe_audio(
+    background_tasks: BackgroundTasks,
     audio_file: UploadFile = File(...),
     current_user: UserResponse = Security(DependencyProviderService.get_current_active_user, scopes=["user"]),
     audio_service: AudioService = Depends(DependencyProviderService.get_audio_service),
@@ -23,7 +24,7 @@ def transcribe_audio(
     Converts an uploaded audio file to text, saves it, and returns the result.
     """
     user_id = str(current_user.id)
-    return audio_service.process_and_transcribe_audio(audio_file, user_id, language_code)
+    return audio_service.process_and_transcribe_audio(audio_file, user_id, language_code, background_tasks)
 
 @router.get("/{audio_id}", response_model=AudioResponse)
 def get_audio(
@@ -38,6 +39,7 @@ def get_audio(
 @router.delete("/{audio_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_audio(
     audio_id: str,
+    background_tasks: BackgroundTasks,
     current_user: UserResponse = Security(DependencyProviderService.get_current_active_user, scopes=["user"]),
     audio_service: AudioService = Depends(DependencyProviderService.get_audio_service)
 ):
@@ -45,7 +47,7 @@ def delete_audio(
     Delete an audio file and its record.
     """
     user_id = str(current_user.id)
-    audio_service.delete_audio(audio_id, user_id)
+    audio_service.delete_audio(audio_id, user_id, background_tasks)
     return None
 
 # POST /audio/upload - Upload audio file (to be implemented)
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, status, Security
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, status, Security, Query
+from typing import List, Dict, Any, Optional
 
 from app.schemas.conversation import ConversationCreate, ConversationResponse, ConversationUpdate
 from app.schemas.user import UserResponse
@@ -12,7 +12,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED)
-def create_conversation(
+async def create_conversation(
     convo_data: ConversationCreate, 
     current_user: UserResponse = Security(provider.get_current_active_user, scopes=["user"]),
     conversation_service: ConversationService = Depends(provider.get_conversation_service)
@@ -21,31 +21,35 @@ def create_conversation(
     Create a new conversation and generate an initial AI response.
     """
     user_id = str(current_user.id)
-    return conversation_service.create_new_conversation(user_id, convo_data)
+    return await conversation_service.create_new_conversation(user_id, convo_data)
 
 @router.get("", response_model=List[ConversationResponse])
-def get_user_conversations(
+async def get_user_conversations(
+    limit: int = Query(default=50, ge=1, le=200, description="Maximum number of conversations to return"),
+    after: Optional[str] = Query(default=None, description="ID of the last conversation from the previous page"),
     current_user: UserResponse = Security(provider.get_current_active_user, scopes=["user"]),
     conversation_service: ConversationService = Depends(provider.get_conversation_service)
 ):
     """
-    Get all conversations for the current user.
+    Get the current user's conversations, newest first.
+    
+    Pass the ID of the last conversation received as `after` to fetch the next page.
     """
     user_id = str(current_user.id)
-    return conversation_service.get_user_conversations(user_id)
+    return await conversation_service.get_user_conversations(user_id, limit=limit, after=after)
 
 @router.get("/{conversation_id}", response_model=ConversationResponse)
-def get_conversation(
+async def get_conversation(
     conversation_id: str,
     conversation_service: ConversationService = Depends(provider.get_conversation_service)
 ):
     """
     Get a specific conversation by its ID.
     """
-    return conversation_service.get_conversation_by_id(conversation_id)
+    return await conversation_service.get_conversation_by_id(conversation_id)
 
 @router.put("/{conversation_id}", response_model=ConversationResponse)
-def update_conversation(
+async def update_conversation(
     conversation_id: str,
     update_data: ConversationUpdate,
     conversation_service: ConversationService = Depends(provider.get_conversation_service)
@@ -53,15 +57,15 @@ def update_conversation(
     """
     Update a conversation's metadata.
     """
-    return conversation_service.update_conversation(conversation_id, update_data)
+    return await conversation_service.update_conversation(conversation_id, update_data)
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_conversation(
+async def delete_conversation(
     conversation_id: str,
     conversation_service: ConversationService = Depends(provider.get_conversation_service)
 ):
     """
     Delete a conversation.
     """
-    conversation_service.delete_conversation(conversation_id)
+    await conversation_service.delete_conversation(conversation_id)
     return None 
\ No newline at end of file
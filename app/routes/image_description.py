@@ -13,14 +13,14 @@ router = APIRouter(
 )
 
 @router.get("/practice", response_model=List[ImageDescriptionResponse])
-def get_practice_images(
+async def get_practice_images(
     service: ImageDescriptionService = Depends(DependencyProviderService.get_image_description_service)
 ):
     """
     Returns a list of practice images with IDs and URLs.
     If new images are found in the directory, they are processed and added.
     """
-    return service.get_practice_images()
+    return await service.get_practice_images()
 
 @router.get("/{image_id}/file", response_class=FileResponse)
 def get_image_file(
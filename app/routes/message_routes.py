@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, BackgroundTasks, Security
+from fastapi import APIRouter, Depends, status, Security
 from typing import List, Dict, Any
 
 from app.schemas.message import MessageResponse, UserAndAIResponse
@@ -19,7 +19,6 @@ async def create_message_from_audio(
     conversation_id: str,
     audio_id: str,
     current_user: UserResponse = Security(DependencyProviderService.get_current_active_user, scopes=["user"]),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     orchestration_service: OrchestrationService = Depends(DependencyProviderService.get_orchestration_service),
 ):
     """
@@ -28,7 +27,7 @@ async def create_message_from_audio(
     """
     user_id = str(current_user.id)
     return await orchestration_service.process_user_message_flow(
-        conversation_id, audio_id, user_id, background_tasks
+        conversation_id, audio_id, user_id
     )
 
 @router.get("/conversations/{conversation_id}", response_model=List[MessageResponse])
@@ -9,14 +9,14 @@ from app.services.dependency_provider_service import DependencyProviderService
 router = APIRouter()
 
 @router.post("/register", response_model=UserRegisterResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user_create: UserCreate, user_service: UserService = Depends(DependencyProviderService.get_user_service)) -> UserRegisterResponse:
+def register_user(user_create: UserCreate, user_service: UserService = Depends(DependencyProviderService.get_user_service)) -> UserRegisterResponse:
     """
     Register a new user and return user info with an authentication token.
     """
     return user_service.register_user(user_create)
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), user_service: UserService = Depends(DependencyProviderService.get_user_service)):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), user_service: UserService = Depends(DependencyProviderService.get_user_service)):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
@@ -32,7 +32,7 @@ async def get_user_profile(
     return current_user
 
 @router.put("/me", response_model=UserResponse)
-async def update_user_profile(
+def update_user_profile(
     user_update: UserUpdate, 
     current_user: UserResponse = Security(DependencyProviderService.get_current_active_user, scopes=["user"]),
     user_service: UserService = Depends(DependencyProviderService.get_user_service)
@@ -43,7 +43,7 @@ async def update_user_profile(
     return user_service.update_user_profile(current_user.id, user_update)
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
-async def delete_user_profile(
+def delete_user_profile(
     current_user: UserResponse = Security(DependencyProviderService.get_current_active_user, scopes=["user"]),
     user_service: UserService = Depends(DependencyProviderService.get_user_service)
 ):
@@ -53,7 +53,7 @@ async def delete_user_profile(
     user_service.delete_user(current_user.id)
 
 @router.get("/all", response_model=List[UserResponse])
-async def get_all_users(
+def get_all_users(
     skip: int = 0, 
     limit: int = 100, 
     user_service: UserService = Depends(DependencyProviderService.get_user_service), 
@@ -1,13 +1,17 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, validator, field_validator
+from typing import Optional, List, Dict, Any, NamedTuple
 from datetime import datetime
 from bson import ObjectId
-from .message import MessageResponse
 
 class ConversationCreate(BaseModel):
-    user_role: str
-    ai_role: str
-    situation: str
+    user_role: str = Field(min_length=1, max_length=100)
+    ai_role: str = Field(min_length=1, max_length=100)
+    situation: str = Field(min_length=1, max_length=500)
+
+    @field_validator("user_role", "ai_role", "situation", mode="before")
+    @classmethod
+    def strip_whitespace(cls, v):
+        return v.strip() if isinstance(v, str) else v
     
 
 class ConversationResponse(BaseModel):
@@ -38,7 +42,12 @@ class ConversationUpdate(BaseModel):
     situation: Optional[str] = None
     ended_at: Optional[datetime] = None
 
+class ContextMessage(NamedTuple):
+    """A stored message reduced to what the AI context needs."""
+    sender: str
+    content: str
+
 class ConversationContext(BaseModel):
     conversation: ConversationResponse
-    messages: List[MessageResponse]
+    messages: List[ContextMessage]
     history: List[Dict[str, Any]]
@@ -6,6 +6,7 @@ for the SpeakAI application. This includes conversation responses, feedback gene
 and any other AI-powered features.
 """
 
+import hashlib
 import json
 import logging
 from typing import Dict, Any, Optional
@@ -15,11 +16,61 @@ from fastapi import HTTPException
 from app.config.settings import settings
 from app.models.results.feedback_result import FeedbackResult
 from app.utils.ai_utils import get_gemini_model, _generate_response, AIServiceError
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Instructions shared by every feedback prompt, kept ahead of the per-call details
+FEEDBACK_PROMPT_PREFIX = """
+            As a language learning assistant, your task is to provide feedback on the user's response 
+            in a given scenario. The feedback should be encouraging, clear, and focused on 
+            improving their language skills.
+
+            **Feedback Requirements:**
+            1.  **Be Encouraging:** Start with a positive and encouraging sentence.
+            2.  **Clarity and Conciseness:** Provide feedback that is easy to understand. 
+                Avoid overly technical jargon.
+            3.  **Constructive Corrections:** If there are grammatical errors or awkward phrasing, 
+                gently correct them and provide a brief explanation.
+            4.  **Actionable Advice:** Suggest specific ways the user can improve, such as using 
+                different vocabulary or sentence structures.
+            5.  **Stay in Character:** If applicable, maintain the persona of your assigned role.
+
+            Please provide the feedback directly, without any additional conversational text
+            unless it's part of the feedback itself.
+"""
+
+# Longest transcription sent to the model for feedback
+MAX_FEEDBACK_TRANSCRIPTION_LENGTH = 5000
+
+# Seconds generated feedback is reused for an identical utterance in the same context
+FEEDBACK_CACHE_TTL = 60 * 60
+
+# Number of trailing history lines (the AI's last turn and the user's reply) that
+# identify what an utterance is answering
+FEEDBACK_CONTEXT_LINES = 2
+
+# Generated feedback text for previously seen (utterance, scenario, last exchange)
+# combinations. Short answers like "yes" or "hello" repeat a lot within the same scenario
+_feedback_cache = TTLCache(maxsize=2048, ttl=FEEDBACK_CACHE_TTL)
+
+
+def _feedback_cache_key(transcription: str, context: "ConversationContext") -> str:
+    """
+    Hash the normalized utterance, the scenario and the last exchange into a compact cache key.
+    
+    The same words can need different feedback as an answer to a different
+    question, so the exchange they belong to is part of the key.
+    """
+    normalized = " ".join(transcription.lower().split())
+    last_exchange = context.previous_exchanges.rstrip().rsplit("\n", FEEDBACK_CONTEXT_LINES)[-FEEDBACK_CONTEXT_LINES:]
+    raw = "\x1f".join(
+        (normalized, context.user_role, context.ai_role, context.situation, *last_exchange)
+    ).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ConversationContext:
     """Data class for conversation context used in AI interactions."""
     user_role: str = "Student"
@@ -99,6 +150,12 @@ class AIService:
         try:
             self._validate_feedback_input(transcription)
             
+            cache_key = _feedback_cache_key(transcription, context)
+            cached_feedback = _feedback_cache.get(cache_key)
+            if cached_feedback is not None:
+                self.logger.debug("Reusing cached feedback for transcription: %s...", transcription[:50])
+                return FeedbackResult(user_feedback=cached_feedback)
+            
             prompt = self._build_feedback_prompt(transcription, context)
             
             # Generate AI feedback
@@ -109,6 +166,7 @@ class AIService:
             
             # Clean and process the response
             cleaned_feedback = self._clean_feedback_response(response)
+            _feedback_cache.set(cache_key, cleaned_feedback)
             
             self.logger.info(f"Successfully generated feedback for transcription: {transcription[:50]}...")
             return FeedbackResult(user_feedback=cleaned_feedback)
@@ -141,7 +199,13 @@ class AIService:
         """
         Validate the input for feedback generation.
         """
-        if not transcription or not transcription.strip():
+        # Length first, so oversized input is rejected before anything scans it
+        if transcription and len(transcription) > MAX_FEEDBACK_TRANSCRIPTION_LENGTH:
+            raise AIServiceError(
+                f"Transcription is too long for feedback generation (max {MAX_FEEDBACK_TRANSCRIPTION_LENGTH} characters)"
+            )
+        # isspace() answers "only whitespace?" without building a stripped copy
+        if not transcription or transcription.isspace():
             raise AIServiceError("Transcription is required for feedback generation")
 
     def _clean_feedback_response(self, response: str) -> str:
@@ -177,12 +241,10 @@ class AIService:
         situation = context.situation
         previous_exchanges = context.previous_exchanges
 
-        # Construct a detailed, user-friendly prompt
-        prompt = f"""
-            As a language learning assistant, your task is to provide feedback on the user's response 
-            in a given scenario. The feedback should be encouraging, clear, and focused on 
-            improving their language skills.
-
+        # The fixed instructions come first so every feedback prompt shares the same
+        # prefix (eligible for the provider's implicit prompt caching); the
+        # per-call scenario, history and transcription follow
+        prompt = FEEDBACK_PROMPT_PREFIX + f"""
             **Scenario Details:**
             - **Your Role:** {ai_role}
             - **User's Role:** {user_role}
@@ -193,19 +255,6 @@ class AIService:
 
             **User's Response to Analyze:**
             "{transcription}"
-
-            **Feedback Requirements:**
-            1.  **Be Encouraging:** Start with a positive and encouraging sentence.
-            2.  **Clarity and Conciseness:** Provide feedback that is easy to understand. 
-                Avoid overly technical jargon.
-            3.  **Constructive Corrections:** If there are grammatical errors or awkward phrasing, 
-                gently correct them and provide a brief explanation.
-            4.  **Actionable Advice:** Suggest specific ways the user can improve, such as using 
-                different vocabulary or sentence structures.
-            5.  **Stay in Character:** If applicable, maintain the persona of your assigned role.
-
-            Please provide the feedback directly, without any additional conversational text
-            unless it's part of the feedback itself.
         """
         
         self.logger.debug(f"Built feedback prompt for transcription: {transcription[:30]}...")
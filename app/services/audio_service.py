@@ -11,18 +11,25 @@ import shutil
 import tempfile
 import json
 import time
-from typing import Dict, Any, Optional, Tuple, List, Protocol, runtime_checkable
+import threading
+import copy
+import hashlib
+import mmap
+from typing import Dict, Any, Optional, Tuple, List, Protocol, Union, runtime_checkable
 from pathlib import Path
 from datetime import datetime
-from fastapi import HTTPException, UploadFile, Depends
+from fastapi import HTTPException, UploadFile, Depends, BackgroundTasks
 from bson import ObjectId
 import inspect
+import numpy as np
 import torch
 import whisper
+from whisper.audio import SAMPLE_RATE
 
 from app.repositories.audio_repository import AudioRepository
 from app.models.audio import Audio
 from app.utils.transcription_error_message import TranscriptionErrorMessages
+from app.utils.cache import TTLCache
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -32,11 +39,31 @@ WHISPER_LANGUAGE_MAPPING = {
     "en-US": "english",
     "vi-VN": "vietnamese",
 }
+_LANG_LOOKUP = WHISPER_LANGUAGE_MAPPING.get
+
+# Audio accepted by the speech-to-text services: a file path, or mono float32
+# samples at Whisper's 16kHz sample rate
+AudioInput = Union[Path, np.ndarray]
+
+# Transcriptions of previously seen uploads, keyed by content hash and language
+_transcription_cache = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+
+# Error messages returned in place of a transcription; these are never cached
+_TRANSCRIPTION_ERRORS = frozenset(message.value for message in TranscriptionErrorMessages)
+
+# Google STT limits: synchronous recognition handles about a minute of audio
+GOOGLE_SYNC_MAX_SECONDS = 60
+GOOGLE_SYNC_MAX_BYTES = 1024 * 1024
+GOOGLE_LONG_RUNNING_TIMEOUT = 300
+
+# Uploads with less voiced audio than this are treated as silence
+MIN_VOICED_DURATION_MS = 200
 
 # Import file utilities
 from app.utils.file_utils import (
     validate_audio_file,
     save_uploaded_file,
+    persist_temp_file,
     cleanup_temp_file,
     create_temp_file,
     get_file_size,
@@ -47,8 +74,8 @@ from app.utils.file_utils import (
 @runtime_checkable
 class SpeechToTextService(Protocol):
     """A protocol for speech-to-text services."""
-    def transcribe(self, audio_file_path: Path, language_code: str = "en-US") -> str:
-        """Transcribes an audio file."""
+    def transcribe(self, audio: AudioInput, language_code: str = "en-US") -> str:
+        """Transcribes an audio file or decoded 16kHz samples."""
         ...
 
 class WhisperSpeechService(SpeechToTextService):
@@ -56,12 +83,15 @@ class WhisperSpeechService(SpeechToTextService):
     def __init__(self, model):
         self.model = model
 
-    def transcribe(self, audio_file_path: Path, language_code: str = "en-US") -> str:
+    def transcribe(self, audio: AudioInput, language_code: str = "en-US") -> str:
         """Transcribes audio using the Whisper model."""
         try:
             start_time = time.time()
-            language = WHISPER_LANGUAGE_MAPPING.get(language_code, "english")  # Default to English
-            result = self.model.transcribe(str(audio_file_path), language=language)
+            language = _LANG_LOOKUP(language_code, "english")  # Default to English
+            # Whisper decodes paths itself via ffmpeg; arrays are used as-is
+            source = audio if isinstance(audio, np.ndarray) else str(audio)
+            fp16 = self.model.device.type == "cuda"
+            result = self.model.transcribe(source, language=language, fp16=fp16)
             end_time = time.time()
             logger.info(f"Whisper transcription took {end_time - start_time:.2f} seconds")
             return result.get("text", "").strip()
@@ -72,26 +102,54 @@ class WhisperSpeechService(SpeechToTextService):
 class GoogleSpeechToTextService(SpeechToTextService):
     """Speech-to-text service using Google Cloud Speech-to-Text as a fallback."""
 
-    def transcribe(self, audio_file_path: Path, language_code: str = "en-US") -> str:
-        """Transcribes audio using Google Cloud Speech-to-Text."""
+    def transcribe(self, audio: Union[AudioInput, bytes], language_code: str = "en-US") -> str:
+        """
+        Transcribes audio using Google Cloud Speech-to-Text.
+        
+        Accepts decoded 16kHz samples, the raw bytes of an encoded audio file,
+        or a path to one.
+        """
         try:
             from google.cloud import speech
             
             client = speech.SpeechClient()
             
-            with open(audio_file_path, "rb") as audio_file_content:
-                content = audio_file_content.read()
-            
-            audio = speech.RecognitionAudio(content=content)
-            config = speech.RecognitionConfig(language_code=language_code)
+            if isinstance(audio, np.ndarray):
+                # Send the decoded samples as raw 16-bit PCM
+                pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+                recognition_audio = speech.RecognitionAudio(content=pcm)
+                config = speech.RecognitionConfig(
+                    encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                    sample_rate_hertz=SAMPLE_RATE,
+                    language_code=language_code
+                )
+                long_audio = len(audio) > GOOGLE_SYNC_MAX_SECONDS * SAMPLE_RATE
+            else:
+                content = audio if isinstance(audio, bytes) else self._read_file(audio)
+                recognition_audio = speech.RecognitionAudio(content=content)
+                config = speech.RecognitionConfig(language_code=language_code)
+                long_audio = len(content) > GOOGLE_SYNC_MAX_BYTES
             
-            response = client.recognize(config=config, audio=audio)
+            if long_audio:
+                # Synchronous recognition rejects audio longer than about a minute
+                operation = client.long_running_recognize(config=config, audio=recognition_audio)
+                response = operation.result(timeout=GOOGLE_LONG_RUNNING_TIMEOUT)
+            else:
+                response = client.recognize(config=config, audio=recognition_audio)
             return " ".join([res.alternatives[0].transcript for res in response.results]).strip()
                 
         except Exception as e:
             logger.warning(f"Google Cloud Speech-to-Text transcription failed: {str(e)}")
             raise
 
+    def _read_file(self, audio_file: Path) -> bytes:
+        """Read an audio file through a read-only memory map."""
+        with open(audio_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
+
 
 class AudioService:
     """
@@ -113,34 +171,198 @@ class AudioService:
             audio_repo: AudioRepository instance
         """
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.upload_dir = Path("app/uploads")
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        # file_utils creates UPLOAD_DIR once at import
+        self.upload_dir = UPLOAD_DIR
         self.audio_repo = audio_repo or AudioRepository()
+        # The service is shared by every request in the worker, but the Whisper model
+        # (kv-cache hooks, CUDA graph buffers) and the stateful Silero VAD model
+        # can't run two calls at once, so model calls are serialized
+        self._model_lock = threading.Lock()
         self.whisper_model = self._load_whisper_model()
+        self.vad_model, self._get_speech_timestamps = self._load_vad_model()
     
+    def _load_vad_model(self):
+        """
+        Load the Silero VAD model used to skip silent uploads.
+        
+        Returns (None, None) if the model can't be loaded, in which case
+        every upload goes straight to transcription.
+        """
+        try:
+            vad_model, vad_utils = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+            return vad_model, vad_utils[0]
+        except Exception as e:
+            logger.warning(f"Silero VAD unavailable, silent uploads will not be filtered: {e}")
+            return None, None
+
+    def _has_speech(self, audio: AudioInput) -> bool:
+        """
+        Check whether decoded audio contains enough voiced frames to transcribe.
+        
+        Undecoded input, or a VAD failure, is assumed to contain speech.
+        """
+        if self.vad_model is None or not isinstance(audio, np.ndarray):
+            return True
+        try:
+            with self._model_lock:
+                timestamps = self._get_speech_timestamps(
+                    torch.from_numpy(audio), self.vad_model, threshold=0.5, sampling_rate=SAMPLE_RATE
+                )
+        except Exception as e:
+            logger.warning(f"VAD check failed, transcribing anyway: {e}")
+            return True
+        voiced_samples = sum(ts["end"] - ts["start"] for ts in timestamps)
+        return voiced_samples * 1000 >= MIN_VOICED_DURATION_MS * SAMPLE_RATE
+
     def _load_whisper_model(self):
         model_size = "large-v3-turbo"
         device = "cuda" if torch.cuda.is_available() else "cpu"
         if device == "cuda":
             logger.info(f"GPU device: {torch.cuda.get_device_name(0)}")
-        return whisper.load_model(model_size, device=device)
+        model = whisper.load_model(model_size, device=device)
+        if device == "cuda":
+            self._convert_to_half(model)
+            self._compile_encoder(model)
+        elif settings.whisper_cpu_int8:
+            model = self._quantize_for_cpu(model)
+        return model
+
+    def _quantize_for_cpu(self, model):
+        """
+        Return an int8 dynamically quantized copy of the Whisper model for CPU.
+        
+        Whisper uses its own nn.Linear subclass, which only differs by casting
+        weights to the input dtype, and quantize_dynamic only converts plain
+        nn.Linear. The layers of a deep copy are retyped to nn.Linear (on CPU
+        everything is fp32, so the cast is a no-op) and the copy is quantized,
+        leaving the loaded model untouched. Returns the original model if
+        quantization fails.
+        """
+        try:
+            start_time = time.time()
+            model_copy = copy.deepcopy(model)
+            for module in model_copy.modules():
+                if isinstance(module, whisper.model.Linear):
+                    module.__class__ = torch.nn.Linear
+            quantized = torch.quantization.quantize_dynamic(model_copy, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"Whisper quantized to int8 for CPU in {time.time() - start_time:.2f} seconds")
+            return quantized
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, using the fp32 Whisper model: {e}")
+            return model
+
+    def _convert_to_half(self, model) -> None:
+        """
+        Store the Whisper weights in fp16 so they aren't recast on every call.
+        
+        LayerNorm modules stay in fp32 because Whisper runs them on float32
+        activations and casts the result back.
+        """
+        model.half()
+        for module in model.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()
+
+    def _compile_encoder(self, model) -> None:
+        """
+        Compile the Whisper encoder with torch.compile and warm it up.
+        
+        Only the encoder is compiled: it always sees a fixed 30-second mel
+        window, while the decoder's kv-cache hooks and growing token shapes
+        would keep triggering recompiles. Falls back to eager mode on failure.
+        """
+        eager_encoder = model.encoder
+        try:
+            start_time = time.time()
+            model.encoder = torch.compile(eager_encoder, mode="reduce-overhead", fullgraph=False)
+            dummy_mel = torch.zeros(
+                1, model.dims.n_mels, whisper.audio.N_FRAMES,
+                device=model.device, dtype=next(eager_encoder.parameters()).dtype
+            )
+            with torch.no_grad():
+                model.encoder(dummy_mel)
+            logger.info(f"Whisper encoder compiled and warmed up in {time.time() - start_time:.2f} seconds")
+        except Exception as e:
+            logger.warning(f"torch.compile failed for the Whisper encoder, using eager mode: {e}")
+            model.encoder = eager_encoder
+
+    def _decode_to_array(self, audio_file: Path) -> AudioInput:
+        """
+        Decode an audio file once into mono float32 samples at 16kHz.
+        
+        Falls back to the original path if decoding fails so the services
+        can still try to read the file themselves.
+        """
+        try:
+            return whisper.load_audio(str(audio_file), sr=SAMPLE_RATE)
+        except Exception as e:
+            logger.warning(f"Could not decode {audio_file} up front, passing the file path instead: {e}")
+            return audio_file
+
+    def _read_audio_bytes(self, audio_file: Path) -> Optional[bytes]:
+        """
+        Read the encoded audio file once so it can be hashed and reused.
+        """
+        try:
+            return audio_file.read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read {audio_file}: {e}")
+            return None
 
     def _transcribe_file(self, audio_file: Path, language_code: str = "en-US", use_whisper: bool = True) -> str:
         """
+        Transcribes an audio file, reusing the cached result for identical uploads.
+        """
+        raw_bytes = self._read_audio_bytes(audio_file)
+        content_hash = hashlib.blake2b(raw_bytes, digest_size=32).hexdigest() if raw_bytes is not None else None
+        cache_key = (content_hash, language_code, use_whisper)
+        if content_hash is not None:
+            cached = _transcription_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcription cache hit for {audio_file}")
+                return cached
+
+        transcription = self._run_transcription(audio_file, language_code, use_whisper, raw_bytes)
+
+        if content_hash is not None and transcription not in _TRANSCRIPTION_ERRORS:
+            _transcription_cache.set(cache_key, transcription)
+        return transcription
+
+    def _transcribe_with_whisper(self, audio: AudioInput, language_code: str) -> str:
+        """Run the shared Whisper model, one call at a time."""
+        with self._model_lock:
+            return WhisperSpeechService(self.whisper_model).transcribe(audio, language_code)
+
+    def _run_transcription(self, audio_file: Path, language_code: str = "en-US", use_whisper: bool = True,
+                           raw_bytes: Optional[bytes] = None) -> str:
+        """
         Transcribes an audio file using a primary service and falls back to another.
+        
+        Whisper gets the decoded samples. Google gets the same samples, or the
+        already-read file bytes if decoding failed, so the file is never read twice.
         """
+        audio = self._decode_to_array(audio_file)
+        if not self._has_speech(audio):
+            logger.info(f"No speech detected in {audio_file}, skipping transcription")
+            return TranscriptionErrorMessages.EMPTY_TRANSCRIPTION.value
+        google_audio = audio if isinstance(audio, np.ndarray) or raw_bytes is None else raw_bytes
+        
         transcription = ""
         try:
-            primary_service = WhisperSpeechService(self.whisper_model) if use_whisper else GoogleSpeechToTextService()
-            transcription = primary_service.transcribe(audio_file, language_code)
+            if use_whisper:
+                transcription = self._transcribe_with_whisper(audio, language_code)
+            else:
+                transcription = GoogleSpeechToTextService().transcribe(google_audio, language_code)
         except Exception as e:
             logger.error(f"Primary transcription failed for {audio_file}: {e}")
 
         if not transcription:
             logger.info(f"Primary transcription was empty or failed, attempting fallback for {audio_file}")
             try:
-                fallback_service = GoogleSpeechToTextService() if use_whisper else WhisperSpeechService(self.whisper_model)
-                transcription = fallback_service.transcribe(audio_file, language_code)
+                if use_whisper:
+                    transcription = GoogleSpeechToTextService().transcribe(google_audio, language_code)
+                else:
+                    transcription = self._transcribe_with_whisper(audio, language_code)
             except Exception as fallback_e:
                 logger.error(f"Fallback transcription failed for {audio_file}: {fallback_e}")
                 return TranscriptionErrorMessages.DEFAULT_FALLBACK_ERROR.value
@@ -150,9 +372,24 @@ class AudioService:
             
         return transcription
 
-    def process_and_transcribe_audio(self, file: UploadFile, user_id: str, language_code: str = "en-US") -> dict:
+    def _run_after_response(self, background_tasks: Optional[BackgroundTasks], func, *args) -> None:
+        """
+        Schedule blocking file cleanup to run after the response is sent.
+        
+        Runs the call inline when no BackgroundTasks instance is available.
+        """
+        if background_tasks is not None:
+            background_tasks.add_task(func, *args)
+        else:
+            func(*args)
+
+    def process_and_transcribe_audio(self, file: UploadFile, user_id: str, language_code: str = "en-US",
+                                     background_tasks: Optional[BackgroundTasks] = None) -> dict:
         """
         Orchestrates the audio processing pipeline: transcription, saving, and cleanup.
+        
+        Temporary files are removed after the response is sent when
+        background_tasks is provided.
         """
         try:
             # Step 1: Transcribe the audio file
@@ -161,11 +398,10 @@ class AudioService:
             # Step 2: Check if transcription was successful
             if transcription and transcription.strip() and transcription != TranscriptionErrorMessages.EMPTY_TRANSCRIPTION.value:
                 try:
-                    # Reset file pointer before saving
-                    file.file.seek(0)
-                    audio_id = self.save_audio_file(file, user_id, language_code)
+                    # Reuse the temporary copy instead of reading the upload again
+                    audio_id = self._persist_temp_as_audio(temp_file_path, file, user_id, language_code)
                     
-                    cleanup_temp_file(temp_file_path)
+                    self._run_after_response(background_tasks, cleanup_temp_file, temp_file_path)
                     
                     return {
                         "audio_id": audio_id,
@@ -174,7 +410,7 @@ class AudioService:
                     }
                 except Exception as e:
                     self.logger.error(f"Error saving audio after successful transcription: {str(e)}")
-                    cleanup_temp_file(temp_file_path)
+                    self._run_after_response(background_tasks, cleanup_temp_file, temp_file_path)
                     return {
                         "audio_id": None,
                         "transcription": transcription,
@@ -182,18 +418,20 @@ class AudioService:
                         "warning": "Transcription successful but audio storage failed"
                     }
             else:
-                cleanup_temp_file(temp_file_path)
+                self._run_after_response(background_tasks, cleanup_temp_file, temp_file_path)
                 return {
                     "audio_id": None,
                     "transcription": "No speech detected in audio file",
                     "success": False
                 }
+        except HTTPException:
+            raise
         except Exception as e:
             self.logger.error(f"Error in audio processing pipeline: {str(e)}")
             # In case of a failure in transcription, temp_file_path might not exist
             # but we can try to clean it up just in case.
             if 'temp_file_path' in locals() and temp_file_path:
-                cleanup_temp_file(temp_file_path)
+                self._run_after_response(background_tasks, cleanup_temp_file, temp_file_path)
             raise HTTPException(
                 status_code=500,
                 detail=f"Error processing audio file: {str(e)}"
@@ -243,9 +481,53 @@ class AudioService:
                 detail=f"Failed to save audio file: {str(e)}"
             )
     
-    def delete_audio(self, audio_id: str, user_id: str):
+    def _persist_temp_as_audio(self, temp_file_path: Path, file: UploadFile, user_id: str, language_code: str = "en-US") -> str:
+        """
+        Store an already transcribed temporary file and create its database record.
+        
+        Args:
+            temp_file_path (Path): Path to the temporary copy of the upload
+            file (UploadFile): The original upload, used for validation and its filename
+            user_id (str): The ID of the user uploading the file
+            language_code (str): The language code of the audio file
+            
+        Returns:
+            str: The ID of the saved audio record
+            
+        Raises:
+            HTTPException: If file saving fails
+        """
+        try:
+            validate_audio_file(file)
+            file_path = persist_temp_file(temp_file_path, user_id, file.filename, "audio")
+            
+            created_audio = self.audio_repo.create_audio(
+                user_id=user_id,
+                filename=file.filename,
+                file_path=str(file_path),
+                language=language_code
+            )
+            
+            audio_id = str(created_audio['_id'])
+            
+            self.logger.info(f"Successfully saved audio file for user {user_id}: {audio_id}")
+            return audio_id
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to save audio file for user {user_id}: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to save audio file: {str(e)}"
+            )
+    
+    def delete_audio(self, audio_id: str, user_id: str, background_tasks: Optional[BackgroundTasks] = None):
         """
         Deletes an audio file record and the physical file.
+        
+        The database record is removed first; the file itself is removed after
+        the response is sent when background_tasks is provided.
         """
         audio_record = self.audio_repo.find_by_id(audio_id)
         if not audio_record:
@@ -255,23 +537,27 @@ class AudioService:
         if str(audio_record['user_id']) != user_id:
             raise HTTPException(status_code=403, detail="User not authorized to delete this audio file")
 
-        # Delete file from storage
-        try:
-            file_path = Path(audio_record['file_path'])
-            if file_path.exists():
-                os.remove(file_path)
-                self.logger.info(f"Deleted audio file: {file_path}")
-        except Exception as e:
-            # Log error but proceed to delete DB record
-            self.logger.error(f"Error deleting audio file {audio_record['file_path']}: {e}")
-
         # Delete record from database
         deleted = self.audio_repo.delete(audio_id)
         if not deleted:
             # This might happen if there's a race condition, but it's good to handle.
             raise HTTPException(status_code=404, detail="Audio record could not be deleted from database")
         
+        # Delete file from storage
+        self._run_after_response(background_tasks, self._remove_audio_file, audio_record['file_path'])
+        
         return {"message": "Audio file deleted successfully"}
+
+    def _remove_audio_file(self, file_path: str) -> None:
+        """
+        Remove a stored audio file, logging rather than raising on failure.
+        """
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                self.logger.info(f"Deleted audio file: {file_path}")
+        except Exception as e:
+            self.logger.error(f"Error deleting audio file {file_path}: {e}")
     
     # Validation is now handled by file_utils.validate_audio_file
     
@@ -281,7 +567,7 @@ class AudioService:
     # TRANSCRIPTION METHODS
     # =============================================================================
     
-    def transcribe_audio(self, file: UploadFile, language_code: str = "en-US") -> Tuple[str, Optional[str]]:
+    def transcribe_audio(self, file: UploadFile, language_code: str = "en-US") -> Tuple[str, Optional[Path]]:
         """
         Transcribe audio file to text using the optimal method.
         
@@ -290,7 +576,7 @@ class AudioService:
             language_code (str): Language code for transcription
             
         Returns:
-            Tuple[str, Optional[str]]: Transcription text and temporary file path
+            Tuple[str, Optional[Path]]: Transcription text and temporary file path
             
         Raises:
             HTTPException: If transcription fails
@@ -302,12 +588,17 @@ class AudioService:
             transcription = self._transcribe_file(temp_file_path, language_code)
             self.logger.debug(f"Transcription completed with length: {len(transcription) if transcription else 0}")
             
-            return transcription, str(temp_file_path)
+            return transcription, temp_file_path
             
+        except HTTPException:
+            # e.g. 413 from create_temp_file when the upload exceeds MAX_FILE_SIZE
+            if temp_file_path:
+                cleanup_temp_file(temp_file_path)
+            raise
         except Exception as e:
             self.logger.error(f"Failed to transcribe audio: {str(e)}")
             if temp_file_path:
-                cleanup_temp_file(str(temp_file_path))
+                cleanup_temp_file(temp_file_path)
             raise HTTPException(
                 status_code=500,
                 detail=f"Audio transcription failed: {str(e)}"
@@ -359,9 +650,9 @@ class AudioService:
                 detail="Failed to retrieve audio metadata"
             )
 
-    def _get_file_size(self, file_path: str) -> Optional[int]:
+    def _get_file_size(self, file_path: Union[str, os.PathLike]) -> Optional[int]:
         """Get file size in bytes."""
         try:
-            return Path(file_path).stat().st_size
-        except:
+            return os.stat(file_path).st_size
+        except OSError:
             return None 
\ No newline at end of file
@@ -5,7 +5,10 @@ This service manages conversation creation, retrieval, and validation
 for the SpeakAI application.
 """
 
+import asyncio
+import hashlib
 import logging
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from bson import ObjectId
@@ -15,19 +18,70 @@ from app.repositories.conversation_repository import ConversationRepository
 from app.repositories.message_repository import MessageRepository
 from app.models.conversation import Conversation
 from app.models.message import Message
-from app.schemas.conversation import ConversationCreate, ConversationResponse, ConversationUpdate, ConversationContext
+from app.schemas.conversation import ConversationCreate, ConversationResponse, ConversationUpdate, ConversationContext, ContextMessage
 from app.schemas.message import MessageResponse
 from app.utils.ai_utils import refine_conversation_context
+from app.utils.async_utils import run_in_thread, run_in_db_thread, run_db_call
+from app.utils.cache import TTLCache
+from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Message fields loaded when building the AI conversation context
+CONTEXT_MESSAGE_PROJECTION = {"_id": 1, "sender": 1, "content": 1}
+_sender_and_content = itemgetter("sender", "content")
+
+# Message sender -> Gemini chat role
+_ROLE_MAP = {"user": "user", "ai": "model", "model": "model"}
+_role_for_sender = _ROLE_MAP.get
+
+# Recently read conversations; entries are dropped on update and delete. Only the
+# worker that made the change drops its entry, so the TTL bounds how long other
+# workers can serve a stale or deleted conversation
+_conversation_cache = TTLCache(maxsize=1024, ttl=settings.conversation_cache_ttl)
+
+# Recently built AI contexts (opt-in), stored as (newest message ID, context). Entries
+# are dropped whenever this service sees the conversation or its messages change, and
+# are checked against the newest stored message before reuse to catch other writers
+_context_cache = TTLCache(maxsize=1024, ttl=settings.conversation_context_cache_ttl)
+
+# Only the ID is needed to check whether a cached context is still current
+_LATEST_MESSAGE_ID_PROJECTION = {"_id": 1}
+
+# Refined contexts for previously seen (user_role, ai_role, situation) templates
+_refined_context_cache = TTLCache(maxsize=512, ttl=24 * 60 * 60)
+
+# Conversation fields needed to build a ConversationResponse
+CONVERSATION_LIST_PROJECTION = {
+    "user_id": 1, "user_role": 1, "ai_role": 1, "situation": 1, "started_at": 1, "ended_at": 1
+}
+
+
+def _fast_conversation(doc: Dict[str, Any]) -> ConversationResponse:
+    """
+    Build a ConversationResponse from a stored conversation without revalidating it.
+    
+    Conversations are written by this service, so their field types are trusted;
+    only the ObjectIds need converting to strings.
+    """
+    return ConversationResponse.model_construct(
+        id=str(doc["_id"]),
+        user_id=str(doc["user_id"]),
+        user_role=doc["user_role"],
+        ai_role=doc["ai_role"],
+        situation=doc["situation"],
+        started_at=doc["started_at"],
+        ended_at=doc.get("ended_at")
+    )
+
 
 class ConversationService:
     """
     Service class for handling conversation business logic.
     
     This service encapsulates all conversation-related operations including
-    creation, retrieval, validation, and management.
+    creation, retrieval, and management. Its public methods are coroutines;
+    blocking repository calls run in worker threads.
     """
     
     def __init__(
@@ -46,24 +100,45 @@ class ConversationService:
         self.conversation_repo = conversation_repo or ConversationRepository()
         self.message_repo = message_repo or MessageRepository()
     
-    def create_new_conversation(self, user_id: str, convo_data: ConversationCreate) -> Dict[str, Any]:
+    async def create_new_conversation(self, user_id: str, convo_data: ConversationCreate) -> Dict[str, Any]:
         """
-        Validates, refines context, and creates a new conversation with an initial message.
+        Refines context and creates a new conversation with an initial message.
+        
+        Field lengths are validated by the ConversationCreate schema.
         """
-        self.validate_conversation_data(convo_data)
+        refined_context = await self._get_refined_context(convo_data)
+        
+        return await self.create_conversation(
+            user_id=user_id,
+            refined_context=refined_context
+        )
+
+    async def _get_refined_context(self, convo_data: ConversationCreate) -> Dict[str, Any]:
+        """
+        Refine the conversation context, reusing the result for repeated templates.
+        
+        Templates are matched exactly after trimming and lowercasing each field.
+        """
+        normalized = "|".join(
+            value.strip().lower() for value in (convo_data.user_role, convo_data.ai_role, convo_data.situation)
+        )
+        cache_key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
         
-        refined_context = refine_conversation_context(
+        cached = _refined_context_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Reusing cached refined context for conversation template")
+            return dict(cached)
+        
+        refined_context = await run_in_thread(
+            refine_conversation_context,
             user_role=convo_data.user_role,
             ai_role=convo_data.ai_role,
             situation=convo_data.situation
         )
-        
-        return self.create_conversation(
-            user_id=user_id,
-            refined_context=refined_context
-        )
+        _refined_context_cache.set(cache_key, dict(refined_context))
+        return refined_context
 
-    def create_conversation(
+    async def create_conversation(
         self, 
         user_id: str, 
         refined_context: Dict[str, Any]
@@ -82,46 +157,86 @@ class ConversationService:
             HTTPException: If conversation creation fails
         """
         try:
-            # Create conversation using repository
-            conversation = self.conversation_repo.create_conversation(
-                user_id=user_id,
-                user_role=refined_context["refined_user_role"],
-                ai_role=refined_context["refined_ai_role"],
-                situation=refined_context["refined_situation"],
-                voice_type=refined_context.get("voice_type")
-            )
-            
-            conversation_id = str(conversation["_id"])
-            
-            # Prepare response data
-            conversation_obj = self.get_conversation_by_id(conversation_id)
-            if not conversation_obj:
-                raise HTTPException(status_code=404, detail="Failed to format conversation response")
-
-            # Create initial AI message using repository
-            initial_message = self.message_repo.create_message(
-                conversation_id=conversation_id,
+            # The conversation ID is generated up front so the initial AI message
+            # can be built and both inserts can run concurrently
+            conversation_oid = ObjectId()
+            initial_message = self.message_repo.build_message_document(
+                conversation_id=conversation_oid,
                 sender="ai",
                 content=refined_context["response"]
             )
-
+            conversation, message_result = await asyncio.gather(
+                run_in_db_thread(
+                    self.conversation_repo.create_conversation,
+                    user_id=user_id,
+                    user_role=refined_context["refined_user_role"],
+                    ai_role=refined_context["refined_ai_role"],
+                    situation=refined_context["refined_situation"],
+                    voice_type=refined_context.get("voice_type"),
+                    conversation_id=conversation_oid
+                ),
+                self._insert_initial_message(initial_message),
+                return_exceptions=True
+            )
+            # Both inserts have finished, so the returned message ID can be used
+            # right away (e.g. for speech); if either failed, undo the other
+            for failed in (conversation, message_result):
+                if isinstance(failed, BaseException):
+                    await self._discard_partial_conversation(
+                        conversation_oid,
+                        conversation_created=not isinstance(conversation, BaseException),
+                        message_created=not isinstance(message_result, BaseException)
+                    )
+                    raise failed
+            
+            # Prepare response data from the documents in hand, no need to re-fetch them
+            conversation_obj = ConversationResponse.model_validate(conversation)
             message_obj = MessageResponse.model_validate(initial_message)
             
-            self.logger.info(f"Successfully created conversation {conversation_id} for user {user_id}")
+            self.logger.info("Successfully created conversation %s for user %s", conversation_oid, user_id)
             
             return {
                 "conversation": conversation_obj,
                 "initial_message": message_obj
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
-            self.logger.error(f"Failed to create conversation for user {user_id}: {str(e)}")
+            self.logger.error("Failed to create conversation for user %s: %s", user_id, e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to create conversation: {str(e)}"
             )
     
-    def get_conversation_context(self, conversation_id: str) -> ConversationContext:
+    async def _insert_initial_message(self, message: Dict[str, Any]) -> None:
+        """Insert a conversation's initial message, then drop any context cached before it landed."""
+        await run_in_db_thread(self.message_repo.create, dict(message))
+        self.invalidate_conversation_context(str(message["conversation_id"]))
+    
+    async def _discard_partial_conversation(self, conversation_oid: ObjectId,
+                                            conversation_created: bool, message_created: bool) -> None:
+        """Remove whichever half of a failed conversation creation was stored."""
+        try:
+            if message_created:
+                await run_db_call(self.message_repo.delete_messages_by_conversation, str(conversation_oid))
+            if conversation_created:
+                await run_db_call(self.conversation_repo.delete, str(conversation_oid))
+        except Exception as e:
+            self.logger.error("Failed to clean up partial conversation %s: %s", conversation_oid, e)
+    
+    def invalidate_conversation_context(self, conversation_id: str) -> None:
+        """
+        Drop the cached context of a conversation.
+        
+        Must be called after any message is added to or removed from the conversation.
+        
+        Args:
+            conversation_id (str): The ID of the conversation
+        """
+        _context_cache.pop(conversation_id)
+    
+    async def get_conversation_context(self, conversation_id: str) -> ConversationContext:
         """
         Retrieve conversation context and message history.
         
@@ -134,115 +249,73 @@ class ConversationService:
         Raises:
             HTTPException: If conversation not found or retrieval fails
         """
+        use_cache = settings.conversation_context_cache_enabled
+        
         try:
-            # The repository now handles ObjectId validation
-            conversation_data = self.conversation_repo.get_conversation_by_id(conversation_id)
+            if use_cache:
+                cached = _context_cache.get(conversation_id)
+                if cached is not None:
+                    cached_version, cached_context = cached
+                    # A cheap indexed lookup of the newest message replaces the full read
+                    latest = await run_db_call(
+                        self.message_repo.get_latest_message,
+                        conversation_id, projection=_LATEST_MESSAGE_ID_PROJECTION
+                    )
+                    if (latest["_id"] if latest else None) == cached_version:
+                        return cached_context
+            
+            # Fetch the conversation and its messages in one round-trip; only the
+            # sender and content of each message (plus its ID, used as the cache
+            # version) are needed for the AI context
+            conversation_data = await run_db_call(
+                self.conversation_repo.get_with_messages,
+                conversation_id, msg_projection=CONTEXT_MESSAGE_PROJECTION
+            )
             if not conversation_data:
                 raise HTTPException(
                     status_code=404,
                     detail="Conversation not found"
                 )
             
-            # Fetch messages for the conversation using repository
-            messages_data = self.message_repo.get_messages_by_conversation(conversation_id)
+            messages_data = conversation_data.pop("messages", [])
+            turns = [ContextMessage._make(_sender_and_content(msg)) for msg in messages_data]
             
             # Format message history for AI context
             history = [
-                {
-                    "role": "user" if msg["sender"] == "user" else "model",
-                    "parts": [msg["content"]]
-                }
-                for msg in messages_data
+                {"role": _role_for_sender(sender, "model"), "parts": [content]}
+                for sender, content in turns
             ]
             
-            self.logger.debug(f"Retrieved conversation context for {conversation_id} with {len(messages_data)} messages")
+            self.logger.debug("Retrieved conversation context for %s with %d messages", conversation_id, len(turns))
             
-            return ConversationContext(
-                conversation=ConversationResponse.model_validate(conversation_data),
-                messages=[MessageResponse.model_validate(msg) for msg in messages_data],
+            context = ConversationContext(
+                conversation=_fast_conversation(conversation_data),
+                messages=turns,
                 history=history
             )
+            if use_cache:
+                version = messages_data[-1]["_id"] if messages_data else None
+                _context_cache.set(conversation_id, (version, context))
+            return context
             
         except HTTPException:
             raise
         except Exception as e:
-            self.logger.error(f"Failed to retrieve conversation context for {conversation_id}: {str(e)}")
+            self.logger.error("Failed to retrieve conversation context for %s: %s", conversation_id, e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to retrieve conversation context: {str(e)}"
             )
     
-    def validate_conversation_data(self, conversation_data: ConversationCreate) -> bool:
+    async def get_user_conversations(self, user_id: str, limit: int = 50,
+                                     after: Optional[str] = None) -> List[ConversationResponse]:
         """
-        Validate conversation creation data.
-        
-        Args:
-            conversation_data (ConversationCreate): The conversation data to validate
-            
-        Returns:
-            bool: True if validation passes
-            
-        Raises:
-            HTTPException: If validation fails
-        """
-        try:
-            # Check required fields
-            if not conversation_data.user_role or not conversation_data.user_role.strip():
-                raise HTTPException(
-                    status_code=400,
-                    detail="User role is required and cannot be empty"
-                )
-            
-            if not conversation_data.ai_role or not conversation_data.ai_role.strip():
-                raise HTTPException(
-                    status_code=400,
-                    detail="AI role is required and cannot be empty"
-                )
-            
-            if not conversation_data.situation or not conversation_data.situation.strip():
-                raise HTTPException(
-                    status_code=400,
-                    detail="Situation is required and cannot be empty"
-                )
-            
-            # Validate length constraints
-            if len(conversation_data.user_role) > 5:
-                raise HTTPException(
-                    status_code=400,
-                    detail="User role must be 100 characters or less"
-                )
-            
-            if len(conversation_data.ai_role) > 5:
-                raise HTTPException(
-                    status_code=400,
-                    detail="AI role must be 100 characters or less"
-                )
-            
-            if len(conversation_data.situation) > 10:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Situation must be 500 characters or less"
-                )
-            
-            self.logger.debug("Conversation data validation passed")
-            return True
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            self.logger.error(f"Validation error: {str(e)}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Validation failed: {str(e)}"
-            )
-    
-    def get_user_conversations(self, user_id: str, limit: int = 50) -> List[ConversationResponse]:
-        """
-        Retrieve conversations for a specific user.
+        Retrieve conversations for a specific user, newest first.
         
         Args:
             user_id (str): The ID of the user
             limit (int): Maximum number of conversations to return
+            after (Optional[str]): ID of the last conversation from the previous page
             
         Returns:
             List[ConversationResponse]: List of user conversations
@@ -252,46 +325,61 @@ class ConversationService:
         """
         try:
             # The repository now handles ObjectId validation
-            conversations = self.conversation_repo.get_user_conversations(
+            conversations = await run_db_call(
+                self.conversation_repo.get_user_conversations,
                 user_id=user_id,
-                limit=limit
+                limit=limit,
+                projection=CONVERSATION_LIST_PROJECTION,
+                after=after
             )
             
-            return [ConversationResponse.model_validate(conv) for conv in conversations]
+            return [_fast_conversation(conv) for conv in conversations]
             
         except HTTPException:
             raise
         except Exception as e:
-            self.logger.error(f"Failed to retrieve conversations for user {user_id}: {str(e)}")
+            self.logger.error("Failed to retrieve conversations for user %s: %s", user_id, e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to retrieve conversations: {str(e)}"
             )
     
-    def get_conversation_by_id(self, conversation_id: str) -> ConversationResponse:
+    async def get_conversation_by_id(self, conversation_id: str) -> ConversationResponse:
         """
         Retrieve a single conversation by its ID.
         """
-        conversation = self.conversation_repo.get_conversation_by_id(conversation_id)
+        cached = _conversation_cache.get(conversation_id)
+        if cached is not None:
+            return cached
+        
+        conversation = await run_db_call(self.conversation_repo.get_conversation_by_id, conversation_id)
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
-        return ConversationResponse.model_validate(conversation)
+        response = _fast_conversation(conversation)
+        _conversation_cache.set(conversation_id, response)
+        return response
 
-    def update_conversation(self, conversation_id: str, update_data: ConversationUpdate) -> Optional[ConversationResponse]:
+    async def update_conversation(self, conversation_id: str, update_data: ConversationUpdate) -> Optional[ConversationResponse]:
         """
         Update conversation metadata.
         """
         update_dict = update_data.model_dump(exclude_unset=True)
-        updated_conversation = self.conversation_repo.update(conversation_id, update_dict)
+        updated_conversation = await run_db_call(self.conversation_repo.update, conversation_id, update_dict)
+        _conversation_cache.pop(conversation_id)
+        _context_cache.pop(conversation_id)
         if not updated_conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         return ConversationResponse.model_validate(updated_conversation)
 
-    def delete_conversation(self, conversation_id: str):
+    async def delete_conversation(self, conversation_id: str):
         """
-        Delete a conversation.
+        Delete a conversation and its messages.
         """
-        deleted = self.conversation_repo.delete(conversation_id)
+        # Remove the messages first so a failure never leaves orphaned messages behind
+        await run_db_call(self.message_repo.delete_messages_by_conversation, conversation_id)
+        deleted = await run_db_call(self.conversation_repo.delete, conversation_id)
+        _conversation_cache.pop(conversation_id)
+        _context_cache.pop(conversation_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Conversation not found")
         return {"message": "Conversation deleted successfully"} 
\ No newline at end of file
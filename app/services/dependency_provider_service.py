@@ -22,106 +22,130 @@ from app.schemas.user import UserResponse
 from app.utils.auth import oauth2_scheme
 from fastapi import Depends
 from fastapi.security import SecurityScopes
-from typing import Dict, Any
+from typing import Dict, Any, Callable, TypeVar
+import threading
+
+T = TypeVar("T")
+
 
 class DependencyProviderService:
+    # Process-wide instances, built on first use and shared across requests
+    _instances: Dict[str, Any] = {}
+    _instances_lock = threading.RLock()
+
+    @staticmethod
+    def _singleton(key: str, factory: Callable[[], T]) -> T:
+        """
+        Return the shared instance stored under key, building it on first use.
+
+        Repositories and services are stateless apart from their collaborators
+        (AudioService also holds the loaded Whisper model), so one instance can
+        serve every request. Double-checked locking keeps the first
+        construction from racing between threadpool workers; the lock is
+        re-entrant because factories resolve their own dependencies.
+        """
+        instance = DependencyProviderService._instances.get(key)
+        if instance is None:
+            with DependencyProviderService._instances_lock:
+                instance = DependencyProviderService._instances.get(key)
+                if instance is None:
+                    instance = factory()
+                    DependencyProviderService._instances[key] = instance
+        return instance
+
     @staticmethod
     def get_audio_repository() -> AudioRepository:
-        return AudioRepository()
+        return DependencyProviderService._singleton("audio_repository", AudioRepository)
 
     @staticmethod
     def get_conversation_repository() -> ConversationRepository:
-        return ConversationRepository()
+        return DependencyProviderService._singleton("conversation_repository", ConversationRepository)
 
     @staticmethod
     def get_feedback_repository() -> FeedbackRepository:
-        return FeedbackRepository()
+        return DependencyProviderService._singleton("feedback_repository", FeedbackRepository)
     
     @staticmethod
     def get_message_repository() -> MessageRepository:
-        return MessageRepository()
+        return DependencyProviderService._singleton("message_repository", MessageRepository)
 
     @staticmethod
     def get_user_repository() -> UserRepository:
-        return UserRepository()
+        return DependencyProviderService._singleton("user_repository", UserRepository)
         
     @staticmethod
     def get_image_description_repository() -> ImageDescriptionRepository:
-        return ImageDescriptionRepository()
+        return DependencyProviderService._singleton("image_description_repository", ImageDescriptionRepository)
 
     @staticmethod
     def get_image_feedback_repository() -> ImageFeedbackRepository:
-        return ImageFeedbackRepository()
+        return DependencyProviderService._singleton("image_feedback_repository", ImageFeedbackRepository)
 
     @staticmethod
     def get_user_service() -> UserService:
-        return UserService(user_repo=DependencyProviderService.get_user_repository())
+        return DependencyProviderService._singleton("user_service", lambda: UserService(user_repo=DependencyProviderService.get_user_repository()))
 
     @staticmethod
     def get_audio_service() -> AudioService:
-        return AudioService(audio_repo=DependencyProviderService.get_audio_repository())
+        return DependencyProviderService._singleton("audio_service", lambda: AudioService(audio_repo=DependencyProviderService.get_audio_repository()))
 
     @staticmethod
     def get_conversation_service() -> ConversationService:
-        return ConversationService(
+        return DependencyProviderService._singleton("conversation_service", lambda: ConversationService(
             conversation_repo=DependencyProviderService.get_conversation_repository(),
             message_repo=DependencyProviderService.get_message_repository()
-        )
+        ))
 
     @staticmethod
     def get_ai_service() -> AIService:
-        return AIService()
+        return DependencyProviderService._singleton("ai_service", AIService)
 
     @staticmethod
     def get_message_service() -> MessageService:
-        return MessageService(
+        return DependencyProviderService._singleton("message_service", lambda: MessageService(
             message_repo=DependencyProviderService.get_message_repository(),
             feedback_repo=DependencyProviderService.get_feedback_repository()
-        )
+        ))
     
     @staticmethod
     def get_tts_service() -> TTSService:
-        return TTSService(
+        return DependencyProviderService._singleton("tts_service", lambda: TTSService(
             message_repo=DependencyProviderService.get_message_repository(),
             conversation_repo=DependencyProviderService.get_conversation_repository()
-        )
+        ))
         
     @staticmethod
     def get_image_description_service() -> ImageDescriptionService:
-        return ImageDescriptionService(
+        return DependencyProviderService._singleton("image_description_service", lambda: ImageDescriptionService(
             image_desc_repo=DependencyProviderService.get_image_description_repository(),
             image_feedback_repo=DependencyProviderService.get_image_feedback_repository()
-        )
+        ))
 
     @staticmethod
     def get_orchestration_service() -> OrchestrationService:
-        return OrchestrationService(
+        return DependencyProviderService._singleton("orchestration_service", lambda: OrchestrationService(
             conversation_service=DependencyProviderService.get_conversation_service(),
             ai_service=DependencyProviderService.get_ai_service(),
             audio_repo=DependencyProviderService.get_audio_repository(),
             message_repo=DependencyProviderService.get_message_repository(),
             feedback_repo=DependencyProviderService.get_feedback_repository()
-        )
+        ))
 
     @staticmethod
     def get_current_active_user(
         security_scopes: SecurityScopes,
         token: str = Depends(oauth2_scheme)
     ) -> UserResponse:
-        user_repo = UserRepository()
-        user_service = UserService(user_repo=user_repo)
-        user_data = user_service.get_user_from_token(token, security_scopes.scopes)
-        return UserResponse(**user_data)
+        user_service = DependencyProviderService.get_user_service()
+        return user_service.get_user_from_token(token, security_scopes.scopes)
 
     @staticmethod
     def get_current_admin_user(
         security_scopes: SecurityScopes,
         token: str = Depends(oauth2_scheme)
     ) -> UserResponse:
-        user_repo = UserRepository()
-        user_service = UserService(user_repo=user_repo)
+        user_service = DependencyProviderService.get_user_service()
         # Enforce "admin" scope
         if "admin" not in security_scopes.scopes:
             security_scopes.scopes.append("admin")
-        user_data = user_service.get_user_from_token(token, security_scopes.scopes)
-        return UserResponse(**user_data)
+        return user_service.get_user_from_token(token, security_scopes.scopes)
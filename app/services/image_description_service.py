@@ -1,28 +1,42 @@
+import asyncio
 import logging
 import os
-import json
+from functools import lru_cache
 from pathlib import Path
-from fastapi import Depends, HTTPException
-import requests
+from typing import Optional, Tuple
+from fastapi import HTTPException
+import httpx
+import orjson
 
 from app.config.settings import settings
 from app.utils.ai_utils import generate_ai_response_in_json_format, generate_image_description
 from app.repositories.image_description_repository import ImageDescriptionRepository
 from app.repositories.image_feedback_repository import ImageFeedbackRepository
 from app.schemas.image_description import ImageFeedbackRequest
+from app.utils.async_utils import run_in_thread, run_in_db_thread, run_db_call
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 IMAGES_DIR = Path(__file__).parent.parent / "uploads" / "images"
 
-class ImageDescriptionService:
-    def __init__(
-        self,
-        image_desc_repo: ImageDescriptionRepository = Depends(),
-        image_feedback_repo: ImageFeedbackRepository = Depends(),
-    ):
-        self.image_desc_repo = image_desc_repo
-        self.image_feedback_repo = image_feedback_repo
-        self.description_prompt = """ Generate a concise and objective description of the provided image, 
+# Maximum number of image descriptions generated at the same time
+IMAGE_DESCRIPTION_CONCURRENCY = 5
+
+# Connection limit and per-request timeout (seconds) when fetching the practice image set
+IMAGE_DOWNLOAD_CONCURRENCY = 16
+IMAGE_DOWNLOAD_TIMEOUT = 30.0
+# Bytes read from the network and written to disk at a time when downloading an image
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Seconds an image file found on disk is trusted to still be there before it is checked again
+IMAGE_EXISTS_CACHE_TTL = 30
+
+_existing_image_paths = TTLCache(maxsize=2048, ttl=IMAGE_EXISTS_CACHE_TTL)
+
+# Instructions for describing a practice image; the same for every image
+DESCRIPTION_PROMPT = """ Generate a concise and objective description of the provided image, 
 suitable for a TOEIC picture description test. The description should be spoken aloud 
 in approximately 30-45 seconds. Focus on the following elements in this order: 
 1. Overall Scene/Main Idea: Begin with a single sentence summarizing what is generally 
@@ -45,12 +59,90 @@ shown. Structure the description logically. Ensure grammatical accuracy and
 fluency. The output should be a direct description, not a story or interpretation
 """
 
-    def _download_images_from_links(self):
+# Prompt comparing a user's description with the reference one, filled in per request
+IMAGE_FEEDBACK_PROMPT_TEMPLATE = """Detail description of image: '{detail_description}'.
+User description: '{user_transcription}'.
+
+Based on the 'Detail description of image' (which serves as a correct and comprehensive reference) and the 'User description' provided above, your task is to analyze the user description and then generate a JSON object as a string.
+better_version will be the improved version of the user description that is grammatically correct, coherent, and more descriptive.
+explanation will be a brief explanation of the changes made to the user description, highlighting the improvements and clarifications.
+This JSON object must have the following exact structure:
+
+{{
+"better_version": "<generated_description>",
+"explanation": "<generated_explanation>"
+}}
+"""
+
+
+@lru_cache(maxsize=1)
+def _scan_image_files(dir_mtime_ns: int) -> Tuple[str, ...]:
+    """
+    List the image files in IMAGES_DIR.
+    
+    Cached on the directory's modification time, which changes whenever a file
+    is added, removed or renamed, so a scan only happens after the folder changes.
+    """
+    with os.scandir(IMAGES_DIR) as entries:
+        return tuple(
+            entry.name for entry in entries
+            if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file()
+        )
+
+
+def _list_image_files() -> Tuple[str, ...]:
+    """Return the practice image file names, creating IMAGES_DIR if needed."""
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    return _scan_image_files(IMAGES_DIR.stat().st_mtime_ns)
+
+
+class ImageDescriptionService:
+    def __init__(
+        self,
+        image_desc_repo: Optional[ImageDescriptionRepository] = None,
+        image_feedback_repo: Optional[ImageFeedbackRepository] = None,
+    ):
+        self.image_desc_repo = image_desc_repo or ImageDescriptionRepository()
+        self.image_feedback_repo = image_feedback_repo or ImageFeedbackRepository()
+
+    async def _download_image(self, client: httpx.AsyncClient, url: str, output_dir: Path) -> None:
+        """
+        Download a single image into output_dir, logging rather than raising on failure.
+        
+        The body is streamed to a temporary file in chunks rather than held in
+        memory, and only renamed into place once complete, so a failed download
+        never leaves a truncated image behind.
+        """
+        filename = url.split('/')[-1]
+        filepath = output_dir / filename
+        partial_path = output_dir / f"{filename}.part"
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    logger.warning(f"Failed to download: {url} with status {response.status_code}")
+                    return
+                
+                f = await run_in_thread(open, partial_path, 'wb')
+                try:
+                    async for chunk in response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                        await run_in_thread(f.write, chunk)
+                finally:
+                    await run_in_thread(f.close)
+            
+            await run_in_thread(os.replace, partial_path, filepath)
+            logger.info(f"Successfully downloaded: {filename}")
+        except Exception as e:
+            logger.error(f"Error downloading {url}: {str(e)}")
+            partial_path.unlink(missing_ok=True)
+
+    async def _download_images_from_links(self):
         """
         Downloads images from a list of URLs in image_link.txt.
+        
+        The downloads run concurrently over one pooled client, limited to
+        IMAGE_DOWNLOAD_CONCURRENCY connections.
         """
         output_dir = IMAGES_DIR
-        output_dir.mkdir(parents=True, exist_ok=True)
         link_file = Path(__file__).parent.parent / 'utils' / 'image_link.txt'
         if not link_file.exists():
             logger.warning(f"Image link file not found at: {link_file}")
@@ -59,50 +151,60 @@ fluency. The output should be a direct description, not a story or interpretatio
         with open(link_file, 'r') as f:
             urls = [line.strip() for line in f if line.strip() and not line.startswith('# ')]
         
-        for url in urls:
-            try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    filename = url.split('/')[-1]
-                    filepath = output_dir / filename
-                    
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    logger.info(f"Successfully downloaded: {filename}")
-                else:
-                    logger.warning(f"Failed to download: {url} with status {response.status_code}")
-            except Exception as e:
-                logger.error(f"Error downloading {url}: {str(e)}")
+        limits = httpx.Limits(max_connections=IMAGE_DOWNLOAD_CONCURRENCY)
+        async with httpx.AsyncClient(limits=limits, timeout=IMAGE_DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
+            await asyncio.gather(*(self._download_image(client, url, output_dir) for url in urls))
 
-    def get_practice_images(self) -> list:
-        try:
-            # Ensure the images directory exists before trying to list its contents
-            IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    async def _describe_image(self, image_file: str, semaphore: asyncio.Semaphore) -> dict:
+        """
+        Generate the description document for a new practice image.
+        
+        Args:
+            image_file: File name of the image inside IMAGES_DIR
+            semaphore: Limits how many vision requests run at once
             
-            if not os.listdir(IMAGES_DIR):
-                self._download_images_from_links()
+        Returns:
+            The image description document, ready to insert
+        """
+        img_path = str(IMAGES_DIR / image_file)
+        async with semaphore:
+            detail_description = await run_in_thread(generate_image_description, img_path, DESCRIPTION_PROMPT)
+        
+        return {
+            "name": f"/uploads/images/{image_file}",
+            "file_path": img_path,
+            "detail_description": detail_description
+        }
 
-            image_files = [f for f in os.listdir(IMAGES_DIR) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    async def get_practice_images(self) -> list:
+        try:
+            image_files = await run_in_thread(_list_image_files)
+            if not image_files:
+                await self._download_images_from_links()
+                image_files = await run_in_thread(_list_image_files)
             if not image_files:
                 return []
 
-            all_images = self.image_desc_repo.find_all()
-            saved_image_dict = {img["name"]: img for img in all_images}
-
-            for image_file in image_files:
-                image_url = f"/uploads/images/{image_file}"
-                if image_url not in saved_image_dict:
-                    img_path = str(IMAGES_DIR / image_file)
-                    detail_description = generate_image_description(img_path, self.description_prompt)
-                    
-                    new_image_data = {
-                        "name": image_url,
-                        "file_path": img_path,
-                        "detail_description": detail_description
-                    }
-                    self.image_desc_repo.create(new_image_data)
+            # Only look up the images on disk instead of loading the whole collection
+            image_urls = [f"/uploads/images/{image_file}" for image_file in image_files]
+            saved_names = await run_db_call(self.image_desc_repo.find_existing_names, image_urls)
+
+            # Describe the new images concurrently; each description is a slow vision API call
+            semaphore = asyncio.Semaphore(IMAGE_DESCRIPTION_CONCURRENCY)
+            results = await asyncio.gather(*(
+                self._describe_image(image_file, semaphore)
+                for image_file, image_url in zip(image_files, image_urls)
+                if image_url not in saved_names
+            ), return_exceptions=True)
+
+            # Store every description that succeeded in one insert, then report any failure
+            new_docs = [result for result in results if not isinstance(result, BaseException)]
+            await run_in_db_thread(self.image_desc_repo.bulk_create, new_docs)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
             
-            return self.image_desc_repo.find_all()
+            return await run_db_call(self.image_desc_repo.find_by_names, image_urls)
 
         except Exception as e:
             logger.error(f"Error getting practice images: {e}", exc_info=True)
@@ -114,8 +216,11 @@ fluency. The output should be a direct description, not a story or interpretatio
             raise HTTPException(status_code=404, detail="Image not found")
         
         image_path = Path(image_doc['file_path'])
-        if not image_path.exists():
-            raise HTTPException(status_code=404, detail="Image file not found on server")
+        # Served images are requested over and over, so skip the stat for recently seen files
+        if _existing_image_paths.get(image_path) is None:
+            if not image_path.exists():
+                raise HTTPException(status_code=404, detail="Image file not found on server")
+            _existing_image_paths.set(image_path, True)
             
         return image_path
 
@@ -127,25 +232,16 @@ fluency. The output should be a direct description, not a story or interpretatio
 
             detail_description = image_data.get('detail_description', 'No description available')
             
-            prompt = f"""Detail description of image: '{detail_description}'.
-User description: '{feedback_request.user_transcription}'.
-
-Based on the 'Detail description of image' (which serves as a correct and comprehensive reference) and the 'User description' provided above, your task is to analyze the user description and then generate a JSON object as a string.
-better_version will be the improved version of the user description that is grammatically correct, coherent, and more descriptive.
-explanation will be a brief explanation of the changes made to the user description, highlighting the improvements and clarifications.
-This JSON object must have the following exact structure:
-
-{{
-"better_version": "<generated_description>",
-"explanation": "<generated_explanation>"
-}}
-"""
+            prompt = IMAGE_FEEDBACK_PROMPT_TEMPLATE.format(
+                detail_description=detail_description,
+                user_transcription=feedback_request.user_transcription
+            )
             try:
                 ai_response = generate_ai_response_in_json_format(prompt)
-                data = json.loads(ai_response)
+                data = orjson.loads(ai_response)
                 better_version = data.get("better_version", "Could not generate improved version")
                 explanation = data.get("explanation", "There was an error processing the feedback")
-            except (json.JSONDecodeError, Exception) as e:
+            except (orjson.JSONDecodeError, Exception) as e:
                 logger.error(f"Error processing AI response for image feedback: {e}")
                 better_version = "Could not generate improved version"
                 explanation = "There was an error processing the feedback"
@@ -1,6 +1,7 @@
 import logging
 from fastapi import Depends, HTTPException
 from typing import Dict, Any, List, Optional
+from pydantic import TypeAdapter
 
 from app.repositories.message_repository import MessageRepository
 from app.repositories.feedback_repository import FeedbackRepository
@@ -10,6 +11,9 @@ from app.utils.object_id import mongo_doc_to_schema
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole page of messages in one call instead of one model at a time
+_MESSAGE_LIST = TypeAdapter(List[MessageResponse])
+
 class MessageService:
     def __init__(
         self,
@@ -21,7 +25,7 @@ class MessageService:
 
     def get_messages_by_conversation(self, conversation_id: str) -> List[MessageResponse]:
         messages_data = self.message_repo.get_messages_by_conversation(conversation_id)
-        return [MessageResponse.model_validate(msg) for msg in messages_data]
+        return _MESSAGE_LIST.validate_python(messages_data)
 
     def get_message(self, message_id: str) -> MessageResponse:
         message = self.message_repo.get_message_by_id(message_id)
@@ -39,18 +43,12 @@ class MessageService:
         """
         Get user-friendly feedback for a specific message.
         """
-        message = self.message_repo.get_message_by_id(message_id)
+        # One aggregation returns the message with its feedback joined in
+        message = self.message_repo.get_message_with_feedback(message_id)
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
 
-        feedback_id = message.get("feedback_id")
-        if not feedback_id:
-            return MessageFeedbackResponse(
-                user_feedback=None,
-                is_ready=False
-            )
-
-        feedback = self.feedback_repo.find_by_id(str(feedback_id))
+        feedback = message["feedback"]
         if not feedback:
             return MessageFeedbackResponse(
                 user_feedback=None,
@@ -2,19 +2,28 @@
 Orchestration Service for handling complex business logic flows
 that require coordination between multiple services.
 """
+import asyncio
 import logging
-from fastapi import Depends, HTTPException, BackgroundTasks
+from typing import Any, Dict, Set, Tuple
+from fastapi import Depends, HTTPException
 from app.services.conversation_service import ConversationService
 from app.services.ai_service import AIService, ConversationContext
 from app.repositories.audio_repository import AudioRepository
 from app.repositories.message_repository import MessageRepository
 from app.repositories.feedback_repository import FeedbackRepository
 from app.schemas.message import MessageResponse, UserAndAIResponse
-from app.utils.object_id import mongo_doc_to_schema
+from app.utils.object_id import mongo_doc_to_schema, str_to_object_id, is_valid_object_id
+from app.utils.async_utils import run_in_thread, run_in_db_thread, run_db_call
 import app.utils.ai_utils as ai_utils
 
 logger = logging.getLogger(__name__)
 
+# Message flows currently being processed, keyed by (user_id, conversation_id, audio_id)
+_inflight_flows: Dict[Tuple[str, str, str], "asyncio.Future[UserAndAIResponse]"] = {}
+
+# Strong references to running feedback jobs so they aren't garbage collected mid-flight
+_feedback_jobs: Set[asyncio.Task] = set()
+
 class OrchestrationService:
     def __init__(
         self,
@@ -30,72 +39,133 @@ class OrchestrationService:
         self.message_repo = message_repo
         self.feedback_repo = feedback_repo
 
-    async def process_user_message_flow(self, conversation_id: str, audio_id: str, user_id: str, background_tasks: BackgroundTasks) -> UserAndAIResponse:
-        conversation_context = self.conversation_service.get_conversation_context(conversation_id)
+    async def process_user_message_flow(self, conversation_id: str, audio_id: str, user_id: str) -> UserAndAIResponse:
+        """
+        Turn an uploaded audio recording into a user message and get the AI's reply.
+        
+        Identical requests that arrive while one is still being processed (client
+        retries, double submits) share its result instead of storing the message
+        and calling the AI a second time.
+        """
+        key = (user_id, conversation_id, audio_id)
+        inflight = _inflight_flows.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(
+                self._process_user_message_flow(conversation_id, audio_id, user_id)
+            )
+            _inflight_flows[key] = inflight
+            inflight.add_done_callback(lambda _: _inflight_flows.pop(key, None))
+        # Shielded so one caller disconnecting doesn't cancel the flow for the others
+        return await asyncio.shield(inflight)
+
+    async def _process_user_message_flow(self, conversation_id: str, audio_id: str, user_id: str) -> UserAndAIResponse:
+        # Reject malformed IDs before any database work, and keep the parsed
+        # conversation ID for both message inserts
+        conversation_oid = str_to_object_id(conversation_id, "conversation ID")
+        if not is_valid_object_id(audio_id):
+            raise HTTPException(status_code=400, detail="Invalid audio ID format")
+
+        # The context and the audio record are independent, so fetch them concurrently
+        conversation_context, audio_data = await asyncio.gather(
+            self.conversation_service.get_conversation_context(conversation_id),
+            run_db_call(self.audio_repo.find_by_id, audio_id)
+        )
         conversation = conversation_context.conversation
 
         if conversation.user_id != user_id:
             raise HTTPException(status_code=403, detail="Access denied to this conversation")
 
-        audio_data = self.audio_repo.find_by_id(audio_id)
         if not audio_data:
             raise HTTPException(status_code=404, detail="Audio data not found")
         
         audio_transcription = audio_data.get("transcription", "")
         audio_filepath = audio_data.get("file_path")
 
-        user_message_doc = self.message_repo.create_message(
-            conversation_id=conversation_id,
-            sender="user",
-            content=audio_transcription,
-            audio_path=audio_filepath,
-            transcription=audio_transcription
+        # Prompt history: the stored exchanges (skipping empty ones) followed by the new user message
+        history_lines = [
+            f"{msg.sender}: {content}"
+            for msg in conversation_context.messages
+            if (content := (msg.content or "").strip())
+        ]
+        history_lines.append(f"user: {audio_transcription}")
+        conversation_history_text = "\n".join(history_lines)
+        prompt = ai_utils.build_conversation_prompt(conversation, conversation_history_text)
+
+        # The user message insert and the AI reply only depend on the transcription,
+        # so run them concurrently. Repository and AI calls are blocking, so they run
+        # in worker threads to keep the event loop free for other requests
+        user_message_doc, ai_text = await asyncio.gather(
+            run_in_db_thread(
+                self.message_repo.create_message,
+                conversation_id=conversation_oid,
+                sender="user",
+                content=audio_transcription,
+                audio_path=audio_filepath,
+                transcription=audio_transcription
+            ),
+            run_in_thread(ai_utils.generate_ai_response, prompt)
+        )
+
+        ai_message_doc = await run_in_db_thread(
+            self.message_repo.create_message,
+            conversation_id=conversation_oid,
+            sender="ai",
+            content=ai_text
         )
 
-        messages = conversation_context.messages
-        # Add the new user message to the history for the AI prompt
-        messages.append(MessageResponse.model_validate(user_message_doc))
+        self.conversation_service.invalidate_conversation_context(conversation_id)
 
-        conversation_history_text = "\n".join([f"{msg.sender}: {msg.content}" for msg in messages])
+        user_message_id = str(user_message_doc['_id'])
 
-        # Generate feedback
+        # Feedback isn't part of the response, so it is generated in the background. It is
+        # scheduled here, once per flow, rather than on a request's BackgroundTasks: those
+        # never run if that request disconnects while a duplicate still waits on the flow
         context_for_feedback = ConversationContext(
             user_role=conversation.user_role,
             ai_role=conversation.ai_role,
             situation=conversation.situation,
             previous_exchanges=conversation_history_text
         )
-        feedback_result = self.ai_service.generate_feedback(audio_transcription, context_for_feedback)
-
-        # Save feedback
         feedback_to_save = {
             "user_id": user_id,
             "conversation_id": conversation_id,
-            "audio_id": str(audio_data["_id"]),
-            "user_message_id": str(user_message_doc['_id']),
-            "user_feedback": feedback_result.user_feedback,
-            "target_id": str(user_message_doc['_id']),
+            "audio_id": audio_data["id"],
+            "user_message_id": user_message_id,
+            "target_id": user_message_id,
             "target_type": "message",
         }
-        created_feedback = self.feedback_repo.create(feedback_to_save)
-        
-        # Link feedback to message
-        self.message_repo.update(str(user_message_doc['_id']), {"feedback_id": str(created_feedback['_id'])})
-        
-        # Generate AI response
-        prompt = ai_utils.build_conversation_prompt(conversation, conversation_history_text)
-        ai_text = ai_utils.generate_ai_response(prompt)
+        feedback_job = asyncio.create_task(run_in_thread(
+            self._generate_and_store_feedback, audio_transcription, context_for_feedback, feedback_to_save
+        ))
+        _feedback_jobs.add(feedback_job)
+        feedback_job.add_done_callback(_feedback_jobs.discard)
 
-        ai_message_doc = self.message_repo.create_message(
-            conversation_id=conversation_id,
-            sender="ai",
-            content=ai_text
+        return UserAndAIResponse(
+            user_message=MessageResponse.model_validate(user_message_doc),
+            ai_message=MessageResponse.model_validate(ai_message_doc)
         )
 
-        user_message = MessageResponse.model_validate(user_message_doc)
-        ai_message = MessageResponse.model_validate(ai_message_doc)
+    def _generate_and_store_feedback(self, transcription: str, context: ConversationContext,
+                                     feedback_to_save: Dict[str, Any]) -> None:
+        """
+        Generate feedback for a user message, save it and link it to the message.
+        
+        Runs in a worker thread as a background job, so failures are logged
+        rather than raised.
+        
+        Args:
+            transcription: The user's transcribed speech
+            context: Conversation context for the feedback prompt
+            feedback_to_save: Feedback document fields other than the feedback itself
+        """
+        user_message_id = feedback_to_save["user_message_id"]
+        try:
+            feedback_result = self.ai_service.generate_feedback(transcription, context)
 
-        return UserAndAIResponse(
-            user_message=user_message,
-            ai_message=ai_message
-        ) 
\ No newline at end of file
+            # Save the feedback, then link it to the message it belongs to
+            created_feedback = self.feedback_repo.create(
+                {**feedback_to_save, "user_feedback": feedback_result.user_feedback}
+            )
+            self.message_repo.update(user_message_id, {"feedback_id": str(created_feedback["_id"])})
+        except Exception as e:
+            logger.error("Failed to generate feedback for message %s: %s", user_message_id, e)
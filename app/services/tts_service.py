@@ -15,6 +15,7 @@ from app.config.settings import settings
 from app.repositories.message_repository import MessageRepository
 from app.repositories.conversation_repository import ConversationRepository
 from app.utils.voice_utils import pick_suitable_voice_name
+from app.utils.async_utils import run_db_call
 from app.schemas.tts import VoiceContextResponse, LatestAIMessage
 
 logger = logging.getLogger(__name__)
@@ -122,7 +123,7 @@ class TTSService:
         """
         Generates a speech audio stream for a given AI message.
         """
-        message = self.message_repo.get_message_by_id(message_id)
+        message = await run_db_call(self.message_repo.get_message_by_id, message_id)
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
 
@@ -134,7 +135,7 @@ class TTSService:
             raise HTTPException(status_code=400, detail="AI Message has no text content to synthesize")
 
         conversation_id = str(message["conversation_id"])
-        conversation = self.conversation_repo.find_by_id(conversation_id)
+        conversation = await run_db_call(self.conversation_repo.find_by_id, conversation_id)
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
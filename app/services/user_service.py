@@ -3,7 +3,10 @@ User Service for handling all user-related business logic.
 """
 
 import logging
+import threading
+import time
 from typing import Dict, Any, Optional, List
+from pydantic import TypeAdapter
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
@@ -14,10 +17,26 @@ from app.utils.security import hash_password, verify_password
 from app.utils.auth import create_access_token, oauth2_scheme
 from app.config.settings import settings
 from jose import jwt, JWTError, ExpiredSignatureError
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 logger.info("UserService initialized")
 
+# Validates a whole page of users in one call instead of one model at a time
+_USER_LIST = TypeAdapter(List[UserResponse])
+
+# Authenticated users by (token, required scopes). A short TTL lets bursts of
+# requests with the same token share one user lookup
+AUTH_CACHE_TTL = 5
+_token_user_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+
+# Striped locks so concurrent misses for the same token wait for a single lookup
+_TOKEN_LOCK_STRIPES = tuple(threading.Lock() for _ in range(64))
+
+
+def _token_lock(token: str) -> threading.Lock:
+    return _TOKEN_LOCK_STRIPES[hash(token) % len(_TOKEN_LOCK_STRIPES)]
+
 class UserService:
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
@@ -27,7 +46,7 @@ class UserService:
         Get all users.
         """
         users = self.user_repo.get_all_users(skip=skip, limit=limit)
-        return [UserResponse.model_validate(user) for user in users]
+        return _USER_LIST.validate_python(users)
 
     def register_user(self, user_create: UserCreate) -> UserRegisterResponse:
         """
@@ -129,6 +148,31 @@ class UserService:
         """
         Decode the JWT token, validate scopes, and return the user.
         This is a regular method, not a dependency.
+        
+        Successful results are cached for AUTH_CACHE_TTL seconds, so profile
+        changes may take that long to show up on authenticated requests.
+        """
+        if token is not None:
+            cache_key = (token, tuple(required_scopes))
+            cached = _token_user_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            with _token_lock(token):
+                cached = _token_user_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                user, expires_at = self._authenticate_token(token, required_scopes)
+                # Don't let a cached entry outlive the token itself
+                if expires_at is None or expires_at - time.time() > AUTH_CACHE_TTL:
+                    _token_user_cache.set(cache_key, user)
+                return user
+        
+        user, _ = self._authenticate_token(token, required_scopes)
+        return user
+    
+    def _authenticate_token(self, token: Optional[str], required_scopes: List[str]):
+        """
+        Decode and check a token, returning the user and the token's expiry timestamp.
         """
         authenticate_value = f'Bearer scope="{ " ".join(required_scopes)}"'
         credentials_exception = HTTPException(
@@ -167,4 +211,4 @@ class UserService:
                     headers={"WWW-Authenticate": authenticate_value},
                 )
         
-        return UserResponse.model_validate(user_data) 
\ No newline at end of file
+        return UserResponse.model_validate(user_data), payload.get("exp")
\ No newline at end of file
@@ -2,11 +2,12 @@
 AI-related utility functions.
 """
 
-import json
 import logging
+import threading
 from typing import Dict, Any, Optional
 
 from fastapi import HTTPException
+import orjson
 import google.generativeai as genai
 from PIL import Image
 
@@ -20,36 +21,38 @@ class AIServiceError(Exception):
     """Custom exception for AI service errors."""
     pass
 
+# Makes Gemini reply with a bare JSON document, without markdown fences or prose
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
 _gemini_model = None
+# Generation runs in worker threads, so guard the one-time initialization
+_gemini_model_lock = threading.Lock()
 
 def get_gemini_model():
     """Initializes and returns the Gemini model, caching it for reuse."""
     global _gemini_model
-    if _gemini_model is None:
-        try:
-            logger.info("Initializing Gemini model...")
-            genai.configure(api_key=settings.get_gemini_api_key())
-            _gemini_model = genai.GenerativeModel(settings.gemini_model_name)
-            logger.info("Gemini model initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini model: {e}")
-            raise AIServiceError("Failed to initialize Gemini model") from e
+    if _gemini_model is not None:
+        return _gemini_model
+    with _gemini_model_lock:
+        if _gemini_model is None:
+            try:
+                logger.info("Initializing Gemini model...")
+                genai.configure(api_key=settings.get_gemini_api_key())
+                _gemini_model = genai.GenerativeModel(settings.gemini_model_name)
+                logger.info("Gemini model initialized successfully.")
+            except Exception as e:
+                logger.error(f"Failed to initialize Gemini model: {e}")
+                raise AIServiceError("Failed to initialize Gemini model") from e
     return _gemini_model
 
-def _generate_response(prompt: str) -> str:
+def _generate_response(prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate a response from the Gemini AI model based on the provided prompt.
     """
     model = get_gemini_model()
-    response = model.generate_content(prompt)
+    response = model.generate_content(prompt, generation_config=generation_config)
     return response.text
 
-def _clean_json_response(response: str) -> str:
-    """
-    Cleans a JSON response string by removing markdown backticks and 'json' prefix.
-    """
-    return response.strip().replace("```json", "").replace("```", "").strip()
-
 def _validate_refinement_response(data_json: Dict[str, Any]) -> None:
     """
     Validate the structure and content of the refined conversation context response.
@@ -84,17 +87,17 @@ def _build_refinement_prompt_init_conversation(
 
 def generate_ai_response_in_json_format(prompt: str) -> str:
     """
-    Generate an AI response and clean JSON formatting markers.
+    Generate an AI response as a JSON document.
+    
+    The model runs in JSON mode, so the reply can be parsed as is.
     """
     try:
-        response = _generate_response(prompt)
+        response = _generate_response(prompt, JSON_GENERATION_CONFIG)
         if not response or not response.strip():
             raise AIServiceError("Empty response from AI service")
         
-        cleaned_response = _clean_json_response(response)
-        
-        logger.debug(f"Generated AI JSON response with length: {len(cleaned_response)}")
-        return cleaned_response
+        logger.debug(f"Generated AI JSON response with length: {len(response)}")
+        return response
     
     except AIServiceError as e:
         logger.error(f"AI service error: {e}")
@@ -118,7 +121,7 @@ def refine_conversation_context(
         prompt = _build_refinement_prompt_init_conversation(user_role, ai_role, situation)
         cleaned_response = generate_ai_response_in_json_format(prompt)
         
-        data_json = json.loads(cleaned_response)
+        data_json = orjson.loads(cleaned_response)
         _validate_refinement_response(data_json)
         
         voice_type = pick_suitable_voice_name(data_json["ai_gender"])
@@ -127,7 +130,7 @@ def refine_conversation_context(
         logger.info(f"Successfully refined conversation context for roles: {user_role} -> {ai_role}")
         return data_json
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON response: {e}\nResponse text: {cleaned_response}")
         raise HTTPException(
             status_code=500,
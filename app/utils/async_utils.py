@@ -0,0 +1,116 @@
+"""
+Async helpers for calling blocking code from coroutines.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from pymongo.errors import AutoReconnect
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Dedicated threads for blocking MongoDB calls, sized to the connection pool: more
+# threads than connections would only queue inside the driver. Keeping them apart
+# from the default executor stops slow AI/SDK calls from starving database I/O
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.mongo_max_pool_size,
+    thread_name_prefix="mongo-io"
+)
+
+# Attempts and initial backoff for database calls that hit a transient error
+DB_RETRY_ATTEMPTS = 3
+DB_RETRY_BASE_DELAY = 0.05
+
+
+async def run_in_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in a worker thread and await its result.
+
+    Used to call the synchronous PyMongo repositories and SDK clients from
+    async services without blocking the event loop.
+
+    Args:
+        func: The blocking callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The value returned by func
+    """
+    return await asyncio.to_thread(functools.partial(func, *args, **kwargs))
+
+
+async def run_in_db_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking repository call on the database executor and await its result.
+    
+    Use this for writes that must not be retried; reads and idempotent updates
+    should go through run_db_call.
+    
+    Args:
+        func: The blocking repository method to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The value returned by func
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, functools.partial(ctx.run, func, *args, **kwargs))
+
+
+def _transient_db_error(exc: BaseException) -> Optional[BaseException]:
+    """
+    Return the transient PyMongo error behind exc, if there is one.
+
+    Repositories wrap driver errors in HTTPException, so the exception chain
+    is searched as well as exc itself. NetworkTimeout subclasses AutoReconnect.
+    """
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        if isinstance(current, AutoReconnect):
+            return current
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+async def run_db_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking repository call in a worker thread, retrying transient errors.
+
+    Connection drops and primary elections (AutoReconnect, NetworkTimeout) are
+    retried with exponential backoff; any other error is raised immediately.
+
+    Args:
+        func: The blocking repository method to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The value returned by func
+    """
+    for attempt in range(DB_RETRY_ATTEMPTS):
+        try:
+            return await run_in_db_thread(func, *args, **kwargs)
+        except Exception as e:
+            transient = _transient_db_error(e)
+            if transient is None or attempt == DB_RETRY_ATTEMPTS - 1:
+                raise
+            delay = DB_RETRY_BASE_DELAY * 2 ** attempt
+            logger.warning(
+                "Transient database error in %s (attempt %d/%d), retrying in %.2fs: %s",
+                getattr(func, "__qualname__", func), attempt + 1, DB_RETRY_ATTEMPTS, delay, transient
+            )
+            await asyncio.sleep(delay)
+
@@ -6,19 +6,34 @@ across services and routes.
 """
 
 import logging
+import os
+import re
 import shutil
 import tempfile
-from typing import Optional
+import time
+from functools import lru_cache
+from typing import Optional, Union
 from pathlib import Path
-from datetime import datetime
 from fastapi import HTTPException, UploadFile
 
 logger = logging.getLogger(__name__)
 
 # Audio file constants
-VALID_AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac']
+VALID_AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac'})
+# Listed in the error message for unsupported formats
+_SUPPORTED_FORMATS_TEXT = ', '.join(sorted(VALID_AUDIO_EXTENSIONS))
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Allowance for multipart boundaries and headers when checking a request's Content-Length
+MULTIPART_OVERHEAD_ALLOWANCE = 64 * 1024  # 64KiB
+
+# Buffer size used when streaming uploads to disk
+COPY_BUFFER_SIZE = 1 << 20  # 1MiB
+
+# Characters outside this set are replaced when sanitizing filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^-_.() a-zA-Z0-9]")
+_FILENAME_SEPARATOR_RUNS = re.compile(r"[_ ]+")
+
 # Upload directory
 UPLOAD_DIR = Path("app/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -47,11 +62,11 @@ def validate_audio_file(file: UploadFile) -> None:
         )
     
     # Check file extension
-    file_extension = Path(file.filename).suffix.lower()
+    file_extension = os.path.splitext(file.filename)[1].lower()
     if file_extension not in VALID_AUDIO_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid audio format. Supported formats: {', '.join(VALID_AUDIO_EXTENSIONS)}"
+            detail=f"Invalid audio format. Supported formats: {_SUPPORTED_FORMATS_TEXT}"
         )
     
     # Check filename length
@@ -83,6 +98,56 @@ def validate_audio_file(file: UploadFile) -> None:
     logger.debug(f"Audio file validation passed for: {file.filename}")
 
 
+def exceeds_upload_limit(content_length: Optional[str]) -> bool:
+    """
+    Check a request's Content-Length header against MAX_FILE_SIZE.
+    
+    Used to reject oversized uploads before the body is read. A missing or
+    malformed header is not treated as too large; copy_upload still enforces
+    the limit while the body is written.
+    
+    Args:
+        content_length: Raw Content-Length header value, if any
+        
+    Returns:
+        True if the declared body is larger than an upload may be
+    """
+    if not content_length or not content_length.isdigit():
+        return False
+    return int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD_ALLOWANCE
+
+
+def copy_upload(source, target) -> int:
+    """
+    Stream an upload into target in COPY_BUFFER_SIZE chunks, enforcing MAX_FILE_SIZE.
+    
+    The size is counted while copying, so an oversized upload is rejected as
+    soon as it crosses the limit even when its size was not known up front.
+    
+    Args:
+        source: Readable binary file object (e.g. UploadFile.file)
+        target: Writable binary file object
+        
+    Returns:
+        Number of bytes written
+        
+    Raises:
+        HTTPException: 413 if the upload exceeds MAX_FILE_SIZE
+    """
+    read = source.read
+    write = target.write
+    total = 0
+    while chunk := read(COPY_BUFFER_SIZE):
+        total += len(chunk)
+        if total > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
+            )
+        write(chunk)
+    return total
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename for safe storage.
@@ -93,15 +158,9 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for filesystem
     """
-    # Replace spaces and unsafe characters
-    safe_chars = "-_.() abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-    sanitized = "".join(c if c in safe_chars else "_" for c in filename)
-    
-    # Replace multiple underscores/spaces with single underscore
-    while "__" in sanitized or "  " in sanitized:
-        sanitized = sanitized.replace("__", "_").replace("  ", " ")
-    
-    return sanitized.replace(" ", "_").strip("_")
+    # Replace unsafe characters, then collapse runs of spaces/underscores into one underscore
+    sanitized = _UNSAFE_FILENAME_CHARS.sub("_", filename)
+    return _FILENAME_SEPARATOR_RUNS.sub("_", sanitized).strip("_")
 
 
 def save_uploaded_file(file: UploadFile, user_id: str, category: str = "audio") -> Path:
@@ -122,37 +181,97 @@ def save_uploaded_file(file: UploadFile, user_id: str, category: str = "audio")
     # Validate the file first
     validate_audio_file(file)
     
-    # Create user directory structure
-    user_dir = UPLOAD_DIR / str(user_id) / category
+    file_path = build_upload_path(user_id, file.filename, category)
+    
+    # Save the file, removing any partial write if the copy fails
+    try:
+        with open(file_path, "wb") as buffer:
+            copy_upload(file.file, buffer)
+    except Exception:
+        cleanup_temp_file(file_path)
+        raise
+    
+    logger.info(f"Successfully saved file: {file_path}")
+    return file_path
+
+
+@lru_cache(maxsize=10_000)
+def _ensure_upload_dir(user_id: str, category: str) -> Path:
+    """
+    Create a user's upload directory for a category, once per process.
+    
+    Later calls are served from the cache without touching the filesystem.
+    """
+    user_dir = UPLOAD_DIR / user_id / category
     user_dir.mkdir(parents=True, exist_ok=True)
+    return user_dir
+
+
+def build_upload_path(user_id: str, filename: Optional[str], category: str = "audio") -> Path:
+    """
+    Build the storage path for an uploaded file, creating the user directory.
     
-    # Generate unique filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
-    filename = file.filename or "unknown_file"
+    Args:
+        user_id: ID of the user who owns the file
+        filename: Original filename of the upload
+        category: File category for organization (default: "audio")
+        
+    Returns:
+        Path where the file should be stored
+    """
+    user_dir = _ensure_upload_dir(str(user_id), category)
+    
+    # Prefix with a nanosecond timestamp (hex) so concurrent uploads don't collide
+    timestamp = f"{time.time_ns():x}"
+    filename = filename or "unknown_file"
     safe_filename = sanitize_filename(f"{timestamp}_{filename}")
-    file_path = user_dir / safe_filename
+    return user_dir / safe_filename
+
+
+def persist_temp_file(temp_file_path: Path, user_id: str, filename: Optional[str], category: str = "audio") -> Path:
+    """
+    Move an already written temporary file into the upload directory.
+    
+    The temporary file is hard-linked into place so the upload is never read
+    a second time. If linking is not possible (e.g. the temp directory lives on
+    another filesystem) the file is moved instead.
+    
+    Args:
+        temp_file_path: Path to the temporary file holding the upload
+        user_id: ID of the user who owns the file
+        filename: Original filename of the upload
+        category: File category for organization (default: "audio")
+        
+    Returns:
+        Path to the saved file
+    """
+    file_path = build_upload_path(user_id, filename, category)
     
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        os.link(temp_file_path, file_path)
+    except OSError:
+        shutil.move(str(temp_file_path), file_path)
     
     logger.info(f"Successfully saved file: {file_path}")
     return file_path
 
 
-def cleanup_temp_file(file_path: Optional[str]) -> None:
+def cleanup_temp_file(file_path: Optional[Union[str, os.PathLike]]) -> None:
     """
     Clean up temporary files to prevent disk space issues.
     
     Args:
         file_path: Path to the temporary file to delete
     """
-    if file_path and Path(file_path).exists():
-        try:
-            Path(file_path).unlink()
-            logger.debug(f"Cleaned up temporary file: {file_path}")
-        except Exception as e:
-            logger.warning(f"Failed to clean up temporary file {file_path}: {str(e)}")
+    if not file_path:
+        return
+    try:
+        os.unlink(file_path)
+        logger.debug(f"Cleaned up temporary file: {file_path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to clean up temporary file {file_path}: {str(e)}")
 
 
 def create_temp_file(file: UploadFile, suffix: Optional[str] = None) -> Path:
@@ -166,8 +285,6 @@ def create_temp_file(file: UploadFile, suffix: Optional[str] = None) -> Path:
     Returns:
         Path to the temporary file
     """
-    import os
-    
     if suffix is None:
         suffix = Path(file.filename or "").suffix or ".tmp"
     
@@ -178,7 +295,7 @@ def create_temp_file(file: UploadFile, suffix: Optional[str] = None) -> Path:
     try:
         # Write uploaded file content to temp file using the file descriptor
         with os.fdopen(temp_fd, 'wb') as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
+            copy_upload(file.file, temp_file)
         # temp_fd is automatically closed when the context manager exits
         
         logger.debug(f"Created temporary file: {temp_file_path}")
@@ -5,6 +5,7 @@ This module centralizes ObjectId conversion and validation to eliminate
 duplication across repositories and services.
 """
 
+import re
 from typing import Any, Dict, List, Optional, Type, TypeVar, Union
 from bson import ObjectId
 from fastapi import HTTPException
@@ -12,6 +13,27 @@ from pydantic import BaseModel
 
 T = TypeVar('T', bound=BaseModel)
 
+# 24 hex characters: the string form of an ObjectId
+_OBJECT_ID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def is_valid_object_id(value: Any) -> bool:
+    """
+    Check whether a value can be converted to an ObjectId.
+    
+    Strings are matched against a precompiled pattern; ObjectId.is_valid, which
+    constructs and discards an ObjectId, is only used for other input types.
+    
+    Args:
+        value: Candidate ID (usually a string)
+        
+    Returns:
+        True if ObjectId(value) would succeed
+    """
+    if isinstance(value, str):
+        return _OBJECT_ID_RE.fullmatch(value) is not None
+    return ObjectId.is_valid(value)
+
 
 def str_to_object_id(id_str: str, field_name: str = "ID") -> ObjectId:
     """
@@ -33,13 +55,13 @@ def str_to_object_id(id_str: str, field_name: str = "ID") -> ObjectId:
             detail=f"{field_name} cannot be empty"
         )
     
-    try:
-        return ObjectId(id_str)
-    except Exception:
+    # Check the format first so invalid input never goes through exception handling
+    if not is_valid_object_id(id_str):
         raise HTTPException(
             status_code=400,
             detail=f"Invalid {field_name} format"
         )
+    return ObjectId(id_str)
 
 
 def validate_object_ids(ids: List[str], field_name: str = "ID") -> List[ObjectId]:
@@ -56,10 +78,7 @@ def validate_object_ids(ids: List[str], field_name: str = "ID") -> List[ObjectId
     Raises:
         HTTPException: If any conversion fails
     """
-    result = []
-    for id_str in ids:
-        result.append(str_to_object_id(id_str, field_name))
-    return result
+    return [str_to_object_id(id_str, field_name) for id_str in ids]
 
 
 def mongo_doc_to_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -70,7 +89,7 @@ def mongo_doc_to_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
         doc: MongoDB document
         
     Returns:
-        Dictionary with _id converted to string id
+        Dictionary keeping the original _id plus its string form as id
     """
     if not doc:
         return doc
@@ -78,9 +97,9 @@ def mongo_doc_to_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
     # Create a copy to avoid modifying original
     result = dict(doc)
     
-    # Convert _id to string id
+    # Expose _id as a string id; _id is kept for schemas aliased to it
     if "_id" in result:
-        result["id"] = str(result.pop("_id"))
+        result["id"] = str(result["_id"])
     
     return result
 
@@ -93,7 +112,7 @@ def mongo_docs_to_dicts(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         docs: List of MongoDB documents
         
     Returns:
-        List of dictionaries with _id converted to string id
+        List of dictionaries with a string id alongside _id
     """
     return [mongo_doc_to_dict(doc) for doc in docs]
 
@@ -179,19 +198,3 @@ def ensure_object_id(value: Union[str, ObjectId]) -> ObjectId:
     
     raise ValueError(f"Cannot convert {type(value)} to ObjectId")
 
-
-def is_valid_object_id(id_str: str) -> bool:
-    """
-    Check if string is a valid ObjectId format.
-    
-    Args:
-        id_str: String to validate
-        
-    Returns:
-        True if valid ObjectId format, False otherwise
-    """
-    try:
-        ObjectId(id_str)
-        return True
-    except Exception:
-        return False 
\ No newline at end of file
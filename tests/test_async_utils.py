@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import async_utils
+from app.utils.async_utils import run_db_call
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(async_utils, "DB_RETRY_BASE_DELAY", 0)
+
+
+def make_flaky(failures, error_factory):
+    """A callable that raises error_factory() for its first `failures` calls"""
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise error_factory()
+        return "ok"
+
+    return flaky, calls
+
+
+def test_run_db_call_retries_auto_reconnect():
+    """Transient connection errors are retried until the call succeeds"""
+    flaky, calls = make_flaky(2, lambda: AutoReconnect("primary stepped down"))
+    assert asyncio.run(run_db_call(flaky)) == "ok"
+    assert len(calls) == 3
+
+
+def test_run_db_call_retries_auto_reconnect_wrapped_by_repository():
+    """AutoReconnect wrapped in an HTTPException by a repository is still retried"""
+    def wrapped_error():
+        # Same chain as `raise HTTPException(...) from e` inside a repository
+        error = HTTPException(status_code=500, detail="Failed to find messages")
+        error.__cause__ = AutoReconnect("connection reset")
+        return error
+
+    flaky, calls = make_flaky(1, wrapped_error)
+    assert asyncio.run(run_db_call(flaky)) == "ok"
+    assert len(calls) == 2
+
+
+def test_run_db_call_gives_up_after_max_attempts():
+    """The last transient error is raised once every attempt has failed"""
+    flaky, calls = make_flaky(async_utils.DB_RETRY_ATTEMPTS, lambda: AutoReconnect("down"))
+    with pytest.raises(AutoReconnect):
+        asyncio.run(run_db_call(flaky))
+    assert len(calls) == async_utils.DB_RETRY_ATTEMPTS
+
+
+def test_run_db_call_does_not_retry_other_errors():
+    """Non-transient errors are raised on the first attempt"""
+    flaky, calls = make_flaky(1, lambda: DuplicateKeyError("duplicate"))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(run_db_call(flaky))
+    assert len(calls) == 1
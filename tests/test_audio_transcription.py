@@ -0,0 +1,62 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audio_service import AudioService
+
+
+class FakeWhisperModel:
+    """Records how many transcriptions run at the same time"""
+
+    def __init__(self):
+        self.device = SimpleNamespace(type="cpu")
+        self.active = 0
+        self.max_active = 0
+        self._counter_lock = threading.Lock()
+
+    def transcribe(self, source, language, fp16):
+        with self._counter_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._counter_lock:
+            self.active -= 1
+        return {"text": "hello"}
+
+
+def make_service():
+    """An AudioService with a fake Whisper model and no VAD, skipping model loading"""
+    service = AudioService.__new__(AudioService)
+    service.logger = logging.getLogger("test_audio_transcription")
+    service._model_lock = threading.Lock()
+    service.whisper_model = FakeWhisperModel()
+    service.vad_model, service._get_speech_timestamps = None, None
+    service._decode_to_array = lambda audio_file: np.zeros(16000, dtype=np.float32)
+    return service
+
+
+def test_overlapping_transcriptions_are_serialized():
+    """Concurrent requests never run the shared Whisper model at the same time"""
+    service = make_service()
+    results = []
+
+    def transcribe():
+        results.append(service._run_transcription(Path("speech.wav")))
+
+    threads = [threading.Thread(target=transcribe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["hello"] * 4
+    assert service.whisper_model.max_active == 1
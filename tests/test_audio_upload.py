@@ -0,0 +1,66 @@
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main import app
+from app.services.audio_service import AudioService
+from app.services.dependency_provider_service import DependencyProviderService
+import app.utils.file_utils as file_utils
+
+client = TestClient(app)
+
+# Upload limit used by these tests instead of the real 50MB
+TEST_MAX_FILE_SIZE = 1024
+
+
+@pytest.fixture
+def audio_upload_overrides(monkeypatch):
+    """Authenticate the request and skip loading the speech models."""
+    monkeypatch.setattr(file_utils, "MAX_FILE_SIZE", TEST_MAX_FILE_SIZE)
+
+    # The upload is rejected while it is copied, before any model is used
+    audio_service = AudioService.__new__(AudioService)
+    audio_service.logger = logging.getLogger("test_audio_upload")
+
+    app.dependency_overrides[DependencyProviderService.get_current_active_user] = (
+        lambda: SimpleNamespace(id="6042d36e9a1f3c2e8c9b4d8f")
+    )
+    app.dependency_overrides[DependencyProviderService.get_audio_service] = lambda: audio_service
+    yield
+    app.dependency_overrides.clear()
+
+
+def test_transcribe_rejects_upload_over_limit_while_copying(audio_upload_overrides):
+    """An upload that passes the Content-Length precheck is still rejected with 413 once it crosses the limit"""
+    # Small enough to pass the header check (limit + multipart allowance), too big to be stored
+    body = b"\0" * (TEST_MAX_FILE_SIZE * 4)
+    assert not file_utils.exceeds_upload_limit(str(len(body)))
+
+    response = client.post(
+        "/api/audio/transcribe",
+        files={"audio_file": ("speech.wav", body, "audio/wav")}
+    )
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+
+
+def test_transcribe_rejects_declared_length_over_limit(monkeypatch):
+    """An upload whose Content-Length is over the limit is rejected with 413 before the body is read"""
+    monkeypatch.setattr(file_utils, "MAX_FILE_SIZE", TEST_MAX_FILE_SIZE)
+    body = b"\0" * (TEST_MAX_FILE_SIZE + file_utils.MULTIPART_OVERHEAD_ALLOWANCE + 1)
+    assert file_utils.exceeds_upload_limit(str(len(body)))
+
+    # No authentication: the middleware answers before routing
+    response = client.post(
+        "/api/audio/transcribe",
+        files={"audio_file": ("speech.wav", body, "audio/wav")}
+    )
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import conversation_service
+from app.services.conversation_service import ConversationService
+
+CONVERSATION_ID = "6042d36e9a1f3c2e8c9b4d8f"
+
+
+def make_conversation_doc(**overrides):
+    doc = {
+        "_id": ObjectId(CONVERSATION_ID),
+        "user_id": ObjectId(),
+        "user_role": "Customer",
+        "ai_role": "Barista",
+        "situation": "Ordering coffee",
+        "started_at": datetime.utcnow(),
+    }
+    doc.update(overrides)
+    return doc
+
+
+def make_service():
+    conversation_repo = MagicMock()
+    conversation_repo.get_conversation_by_id.return_value = make_conversation_doc()
+    return ConversationService(conversation_repo=conversation_repo, message_repo=MagicMock()), conversation_repo
+
+
+def setup_function():
+    conversation_service._conversation_cache.clear()
+
+
+def test_get_conversation_by_id_is_cached():
+    """A second read of the same conversation is served from the cache"""
+    service, conversation_repo = make_service()
+
+    asyncio.run(service.get_conversation_by_id(CONVERSATION_ID))
+    asyncio.run(service.get_conversation_by_id(CONVERSATION_ID))
+
+    assert conversation_repo.get_conversation_by_id.call_count == 1
+
+
+def test_update_conversation_evicts_cached_entry():
+    """Updating a conversation drops the cached copy so the new roles are read back"""
+    service, conversation_repo = make_service()
+    asyncio.run(service.get_conversation_by_id(CONVERSATION_ID))
+
+    updated = make_conversation_doc(ai_role="Waiter")
+    conversation_repo.update.return_value = updated
+    conversation_repo.get_conversation_by_id.return_value = updated
+    asyncio.run(service.update_conversation(CONVERSATION_ID, conversation_service.ConversationUpdate(ai_role="Waiter")))
+
+    assert conversation_service._conversation_cache.get(CONVERSATION_ID) is None
+    assert asyncio.run(service.get_conversation_by_id(CONVERSATION_ID)).ai_role == "Waiter"
+
+
+def test_delete_conversation_evicts_cached_entry():
+    """Deleting a conversation drops the cached copy so it is no longer served"""
+    service, conversation_repo = make_service()
+    asyncio.run(service.get_conversation_by_id(CONVERSATION_ID))
+
+    conversation_repo.delete.return_value = True
+    asyncio.run(service.delete_conversation(CONVERSATION_ID))
+
+    assert conversation_service._conversation_cache.get(CONVERSATION_ID) is None
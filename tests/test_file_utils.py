@@ -0,0 +1,44 @@
+import io
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.utils.file_utils as file_utils
+
+
+def test_copy_upload_copies_everything_under_limit(monkeypatch):
+    """Uploads within the limit are copied completely, across several chunks"""
+    monkeypatch.setattr(file_utils, "COPY_BUFFER_SIZE", 16)
+    data = bytes(range(100))
+    target = io.BytesIO()
+    assert file_utils.copy_upload(io.BytesIO(data), target) == len(data)
+    assert target.getvalue() == data
+
+
+def test_copy_upload_rejects_upload_over_limit(monkeypatch):
+    """An upload is rejected with 413 as soon as it crosses MAX_FILE_SIZE"""
+    monkeypatch.setattr(file_utils, "MAX_FILE_SIZE", 32)
+    monkeypatch.setattr(file_utils, "COPY_BUFFER_SIZE", 16)
+    target = io.BytesIO()
+    with pytest.raises(HTTPException) as exc_info:
+        file_utils.copy_upload(io.BytesIO(b"\0" * 64), target)
+    assert exc_info.value.status_code == 413
+    # Nothing past the limit is written
+    assert len(target.getvalue()) <= 32
+
+
+@pytest.mark.parametrize("content_length, expected", [
+    (None, False),
+    ("", False),
+    ("abc", False),
+    ("100", False),
+    (str(file_utils.MAX_FILE_SIZE + file_utils.MULTIPART_OVERHEAD_ALLOWANCE + 1), True),
+])
+def test_exceeds_upload_limit(content_length, expected):
+    """Only a well-formed Content-Length above the limit plus multipart overhead is too large"""
+    assert file_utils.exceeds_upload_limit(content_length) is expected
@@ -0,0 +1,109 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories import message_repository
+from app.repositories.message_repository import MessageRepository
+
+MESSAGE_ID = "6042d36e9a1f3c2e8c9b4d8f"
+
+
+@pytest.fixture
+def repo():
+    """A MessageRepository backed by a mock collection, with empty caches"""
+    message_repository._message_cache.clear()
+    message_repository._pending_feedback.clear()
+    repository = MessageRepository()
+    repository.collection = MagicMock()
+    repository.collection.find_one.return_value = {
+        "_id": ObjectId(MESSAGE_ID), "sender": "user", "content": "hello"
+    }
+    repository.collection.aggregate.return_value = [
+        {"_id": ObjectId(MESSAGE_ID), "sender": "user", "content": "hello", "feedback": []}
+    ]
+    repository.collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MESSAGE_ID), "sender": "user", "content": "hello", "feedback_id": "x"
+    }
+    repository.collection.delete_one.return_value.deleted_count = 1
+    repository.collection.delete_many.return_value.deleted_count = 1
+    return repository
+
+
+def test_get_message_by_id_is_cached(repo):
+    """A second read of the same message doesn't query the collection"""
+    first = repo.get_message_by_id(MESSAGE_ID)
+    second = repo.get_message_by_id(MESSAGE_ID)
+    assert first == second
+    assert repo.collection.find_one.call_count == 1
+
+
+def test_cached_message_is_returned_as_a_copy(repo):
+    """Callers can't modify the cached document"""
+    repo.get_message_by_id(MESSAGE_ID)["content"] = "changed"
+    assert repo.get_message_by_id(MESSAGE_ID)["content"] == "hello"
+
+
+def test_missing_message_is_not_cached(repo):
+    """A message that isn't found is looked up again next time"""
+    repo.collection.find_one.return_value = None
+    assert repo.get_message_by_id(MESSAGE_ID) is None
+    assert repo.get_message_by_id(MESSAGE_ID) is None
+    assert repo.collection.find_one.call_count == 2
+
+
+@pytest.mark.parametrize("change", [
+    lambda repo: repo.update(MESSAGE_ID, {"feedback_id": "x"}),
+    lambda repo: repo.update_message_feedback(MESSAGE_ID, "x"),
+    lambda repo: repo.delete(MESSAGE_ID),
+    lambda repo: repo.delete_by_ids([ObjectId(MESSAGE_ID)]),
+])
+def test_changes_evict_cached_message(repo, change):
+    """Updating or deleting a message drops its cached copy"""
+    repo.get_message_by_id(MESSAGE_ID)
+    change(repo)
+    repo.get_message_by_id(MESSAGE_ID)
+    assert repo.collection.find_one.call_count == 2
+
+
+def test_pending_feedback_is_answered_from_cache(repo):
+    """Polling a message with no feedback yet only queries once within the TTL"""
+    first = repo.get_message_with_feedback(MESSAGE_ID)
+    second = repo.get_message_with_feedback(MESSAGE_ID)
+    assert first["feedback"] is None
+    assert second["feedback"] is None
+    assert repo.collection.aggregate.call_count == 1
+
+
+@pytest.mark.parametrize("change", [
+    lambda repo: repo.update(MESSAGE_ID, {"feedback_id": "x"}),
+    lambda repo: repo.delete(MESSAGE_ID),
+    lambda repo: repo.delete_by_ids([ObjectId(MESSAGE_ID)]),
+])
+def test_changes_evict_pending_feedback(repo, change):
+    """Linking feedback to (or deleting) a message drops the "not ready" entry"""
+    repo.get_message_with_feedback(MESSAGE_ID)
+    change(repo)
+
+    feedback_id = ObjectId()
+    repo.collection.aggregate.return_value = [{
+        "_id": ObjectId(MESSAGE_ID), "sender": "user", "content": "hello", "feedback_id": str(feedback_id),
+        "feedback": [{"_id": feedback_id, "user_feedback": "Good job"}]
+    }]
+    message = repo.get_message_with_feedback(MESSAGE_ID)
+    assert repo.collection.aggregate.call_count == 2
+    assert message["feedback"]["id"] == str(feedback_id)
+
+
+def test_found_feedback_is_not_remembered_as_pending(repo):
+    """Messages whose feedback exists are not put in the pending cache"""
+    repo.collection.aggregate.return_value = [{
+        "_id": ObjectId(MESSAGE_ID), "feedback": [{"_id": ObjectId(), "user_feedback": "Good job"}]
+    }]
+    repo.get_message_with_feedback(MESSAGE_ID)
+    assert message_repository._pending_feedback.get(MESSAGE_ID) is None
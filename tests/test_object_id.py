@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.object_id import is_valid_object_id, mongo_doc_to_dict, mongo_docs_to_dicts, str_to_object_id
+
+
+def test_mongo_doc_to_dict_keeps_id_and_adds_string_id():
+    """Converted documents keep the ObjectId _id and gain its string form as id"""
+    oid = ObjectId()
+    doc = {"_id": oid, "name": "test"}
+    result = mongo_doc_to_dict(doc)
+    assert result["_id"] == oid
+    assert result["id"] == str(oid)
+    assert result["name"] == "test"
+    # The original document is not modified
+    assert "id" not in doc
+
+
+def test_mongo_doc_to_dict_without_id_or_empty():
+    """Documents without _id are copied unchanged; empty input is returned as is"""
+    assert mongo_doc_to_dict({"name": "test"}) == {"name": "test"}
+    assert mongo_doc_to_dict(None) is None
+    assert mongo_doc_to_dict({}) == {}
+
+
+def test_mongo_docs_to_dicts_converts_each_document():
+    """Every document in a list gets a string id"""
+    oids = [ObjectId(), ObjectId()]
+    results = mongo_docs_to_dicts([{"_id": oid} for oid in oids])
+    assert [result["id"] for result in results] == [str(oid) for oid in oids]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("6042d36e9a1f3c2e8c9b4d8f", True),
+    ("6042D36E9A1F3C2E8C9B4D8F", True),
+    ("6042d36e9a1f3c2e8c9b4d8", False),
+    ("6042d36e9a1f3c2e8c9b4d8fa", False),
+    ("6042d36e9a1f3c2e8c9b4d8g", False),
+    ("", False),
+    (ObjectId("6042d36e9a1f3c2e8c9b4d8f"), True),
+    (None, False),
+])
+def test_is_valid_object_id(value, expected):
+    """Only 24 hex character strings (or ObjectIds) are valid"""
+    assert is_valid_object_id(value) is expected
+
+
+def test_str_to_object_id_rejects_invalid_format():
+    """Malformed IDs are rejected with a 400"""
+    with pytest.raises(HTTPException) as exc_info:
+        str_to_object_id("not-an-id", "message ID")
+    assert exc_info.value.status_code == 400
+    assert str_to_object_id("6042d36e9a1f3c2e8c9b4d8f") == ObjectId("6042d36e9a1f3c2e8c9b4d8f")
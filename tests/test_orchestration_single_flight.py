@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import orchestration_service
+from app.services.orchestration_service import OrchestrationService
+import app.utils.ai_utils as ai_utils
+
+
+def make_service(monkeypatch, calls, delay=0.05):
+    """An OrchestrationService whose message flow only records its calls"""
+    async def fake_flow(self, conversation_id, audio_id, user_id):
+        calls.append((user_id, conversation_id, audio_id))
+        await asyncio.sleep(delay)
+        return f"response {len(calls)}"
+
+    monkeypatch.setattr(OrchestrationService, "_process_user_message_flow", fake_flow)
+    return OrchestrationService(MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+
+def test_identical_concurrent_requests_share_one_flow(monkeypatch):
+    """Duplicate submissions of the same audio run the flow once and get the same result"""
+    calls = []
+    service = make_service(monkeypatch, calls)
+
+    async def submit_twice():
+        return await asyncio.gather(
+            service.process_user_message_flow("conv", "audio", "user"),
+            service.process_user_message_flow("conv", "audio", "user"),
+        )
+
+    first, second = asyncio.run(submit_twice())
+    assert len(calls) == 1
+    assert first == second
+    assert orchestration_service._inflight_flows == {}
+
+
+def test_different_requests_run_separately(monkeypatch):
+    """Requests for different audio are not merged"""
+    calls = []
+    service = make_service(monkeypatch, calls)
+
+    async def submit_both():
+        return await asyncio.gather(
+            service.process_user_message_flow("conv", "audio-1", "user"),
+            service.process_user_message_flow("conv", "audio-2", "user"),
+        )
+
+    asyncio.run(submit_both())
+    assert len(calls) == 2
+
+
+def test_finished_flow_is_not_reused(monkeypatch):
+    """A request made after the first one finished runs the flow again"""
+    calls = []
+    service = make_service(monkeypatch, calls, delay=0)
+
+    asyncio.run(service.process_user_message_flow("conv", "audio", "user"))
+    asyncio.run(service.process_user_message_flow("conv", "audio", "user"))
+    assert len(calls) == 2
+
+
+def make_message_doc(sender, content, **fields):
+    return {"_id": ObjectId(), "conversation_id": ObjectId(), "sender": sender,
+            "content": content, "timestamp": datetime.utcnow(), **fields}
+
+
+def test_feedback_runs_once_when_first_caller_disconnects(monkeypatch):
+    """Feedback is still generated and linked, exactly once, if the request that started the flow is cancelled"""
+    async def slow_ai_response(prompt):
+        await asyncio.sleep(0.05)
+        return "Nice to meet you"
+
+    monkeypatch.setattr(ai_utils, "build_conversation_prompt", lambda conversation, history: "prompt")
+    monkeypatch.setattr(orchestration_service, "run_in_thread",
+                        lambda func, *args, **kwargs: slow_ai_response(*args) if func is ai_utils.generate_ai_response
+                        else asyncio.to_thread(func, *args, **kwargs))
+
+    conversation = SimpleNamespace(user_id="user", user_role="Guest", ai_role="Host", situation="Party")
+    conversation_service = MagicMock()
+    conversation_service.get_conversation_context = AsyncMock(
+        return_value=SimpleNamespace(conversation=conversation, messages=[])
+    )
+    audio_repo = MagicMock()
+    audio_repo.find_by_id.return_value = {"id": "audio", "transcription": "Hello", "file_path": None}
+    message_repo = MagicMock()
+    message_repo.create_message.side_effect = lambda **fields: make_message_doc(fields["sender"], fields["content"])
+    ai_service = MagicMock()
+    ai_service.generate_feedback.return_value = SimpleNamespace(user_feedback="Good job")
+    feedback_repo = MagicMock()
+    feedback_repo.create.return_value = {"_id": ObjectId()}
+    service = OrchestrationService(conversation_service, ai_service, audio_repo, message_repo, feedback_repo)
+
+    conversation_id, audio_id = str(ObjectId()), str(ObjectId())
+
+    async def first_disconnects_second_waits():
+        first = asyncio.create_task(service.process_user_message_flow(conversation_id, audio_id, "user"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(service.process_user_message_flow(conversation_id, audio_id, "user"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        while orchestration_service._feedback_jobs:
+            await asyncio.gather(*orchestration_service._feedback_jobs)
+        return result
+
+    result = asyncio.run(first_disconnects_second_waits())
+    assert result.ai_message.content == "Nice to meet you"
+    assert message_repo.create_message.call_count == 2
+    feedback_repo.create.assert_called_once()
+    message_repo.update.assert_called_once()